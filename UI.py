@@ -25,7 +25,10 @@ class UI:
 			"position": position,
 			"color": color,
 			"centered": centered,
-			"force": force
+			"force": force,
+			# The last rendered text, only rendered again when it changes
+			"surface": None,
+			"rendered": None
 		}
 
 	def update(self):
@@ -43,12 +46,15 @@ class UI:
 		"""
 		for element in self.UI_elements.values():
 			if element["force"] == force:
-				text_surface = element["font"].render(element["text"], False, element["color"])
-				self.game.screen.blit(text_surface, (
+				if element["rendered"] != (element["text"], element["color"]):
+					element["surface"] = element["font"].render(element["text"], False, element["color"])
+					element["rendered"] = (element["text"], element["color"])
+				text_surface = element["surface"]
+				self.game.dirty_rects.append(self.game.screen.blit(text_surface, (
 					element["position"][0] - (
 						text_surface.get_width() // 2 * element["centered"]
 					),
 					element["position"][1] - (
 						text_surface.get_height() // 2 * element["centered"]
 					)
-				))
+				)))
@@ -0,0 +1,69 @@
+import pygame
+import numpy as np
+
+from settings import SETTINGS
+
+
+class AmbientOcclusion:
+	"""
+	Screen-space ambient occlusion computed from the depth buffer at a reduced resolution, then upsampled.
+	A pixel gets darkened when it is further away than the average depth around it, which happens behind the edges of
+	closer walls and sprites.
+	"""
+	def __init__(self, downscale: int = SETTINGS.graphics.ambient_occlusion_downscale):
+		"""
+		:param downscale: By how much the resolution of the pass is divided, default is defined in settings.json
+		"""
+		self.downscale = downscale
+		self.resolution = (
+			SETTINGS.graphics.resolution[0] // downscale,
+			SETTINGS.graphics.resolution[1] // downscale
+		)
+
+		# The shading computed at the reduced resolution, and upsampled to the size of the screen
+		self.texture = pygame.Surface(self.resolution).convert()
+		self.upsampled_texture = pygame.Surface(SETTINGS.graphics.resolution).convert()
+
+
+	@staticmethod
+	def box_blur(array: np.ndarray, radius: int) -> np.ndarray:
+		"""
+		Returns the average of each element of the array with its neighbours, using cumulative sums.
+		:param array: A 2D array.
+		:param radius: How many neighbours are averaged on each side of an element.
+		"""
+		size = 2 * radius + 1
+		for axis in (0, 1):
+			padding = [(0, 0), (0, 0)]
+			padding[axis] = (radius + 1, radius)
+			sums = np.cumsum(np.pad(array, padding, mode="edge"), axis=axis, dtype=np.float32)
+			array = (
+				sums[size:] - sums[:-size] if axis == 0 else sums[:, size:] - sums[:, :-size]
+			) / size
+		return array
+
+
+	def apply(self, surface: pygame.Surface, depth_buffer: np.ndarray):
+		"""
+		Darkens the given surface based on the given depth buffer.
+		:param surface: The surface to darken, of the size of the screen.
+		:param depth_buffer: The depth of each pixel of the surface.
+		"""
+		# Samples the depth buffer at the resolution of the pass
+		depths = depth_buffer[::self.downscale, ::self.downscale][:self.resolution[0], :self.resolution[1]]
+
+		# The further a pixel is behind its surroundings, the darker it gets
+		average_depths = self.box_blur(depths, max(SETTINGS.graphics.ambient_occlusion_radius // self.downscale, 1))
+		occlusion = (depths - average_depths) / depths * SETTINGS.graphics.ambient_occlusion_strength
+		# Nothing occludes the sky
+		occlusion[depths >= SETTINGS.graphics.max_depth] = 0
+		shading = 255 - np.clip(occlusion * 255, 0, 255).astype(np.uint8)
+
+		# Writes the shading as shades of gray, each color channel taking one byte of the pixels
+		pixels = pygame.surfarray.pixels2d(self.texture)
+		np.multiply(shading, 0x010101, out=pixels, dtype=np.uint32, casting="unsafe")
+		del pixels
+
+		# Upsamples the shading, and multiplies the surface with it
+		pygame.transform.smoothscale(self.texture, SETTINGS.graphics.resolution, self.upsampled_texture)
+		surface.blit(self.upsampled_texture, (0, 0), special_flags=pygame.BLEND_MULT)
@@ -0,0 +1,133 @@
+"""
+Renders scripted camera motions through render backends without opening a window, and reports the median render time
+of each motion, so the caches reused between frames are measured while the camera moves and not only while it stands
+still.
+Usage : python benchmark.py [backend ...] [--frames N] [--seed S] [--projectiles P]
+"""
+import os
+# Renders without a window nor sound
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import math
+import random
+import sys
+import time
+import numpy as np
+
+from settings import SETTINGS
+from render_backends import BACKENDS, get_backend
+from main import Game
+
+
+def get_start(game, seed: int) -> tuple:
+	"""
+	Returns a random position on the floor of the map, and the angle of its longest line of empty tiles.
+	:param game: The instance of the Game.
+	:param seed: The seed of the random position.
+	:return: The x, y and angle of the start of the motions.
+	"""
+	generator = random.Random(seed)
+	while True:
+		x = generator.uniform(1, game.map.map_size[0] - 1)
+		y = generator.uniform(1, game.map.map_size[1] - 1)
+		if (int(x), int(y)) not in game.map.world_map:
+			break
+
+	def free_length(angle: float) -> float:
+		length = 0
+		while (int(x + math.cos(angle) * length), int(y + math.sin(angle) * length)) not in game.map.world_map:
+			length += 0.1
+		return length
+	return x, y, max((i * math.tau / 16 for i in range(16)), key=free_length)
+
+
+def get_motions(game, frames: int, seed: int) -> dict:
+	"""
+	Returns the scripted poses of each motion : standing still, turning by 0.01 radians per frame, and walking back and
+	forth along a line of empty tiles.
+	:param game: The instance of the Game.
+	:param frames: The amount of frames of each motion.
+	:param seed: The seed of the start of the motions.
+	:return: A list of (x, y, angle) for each motion, by name.
+	"""
+	x, y, angle = get_start(game, seed)
+	walk = []
+	step = 0.02
+	for _ in range(frames):
+		next_x, next_y = x + math.cos(angle) * step * 10, y + math.sin(angle) * step * 10
+		if (int(next_x), int(next_y)) in game.map.world_map:
+			step = -step
+		x, y = x + math.cos(angle) * step, y + math.sin(angle) * step
+		walk.append((x, y, angle))
+
+	return {
+		"still": [walk[0]] * frames,
+		"turn": [(walk[0][0], walk[0][1], angle + 0.01 * frame) for frame in range(frames)],
+		"walk": walk
+	}
+
+
+def spawn_projectiles(game, amount: int, seed: int):
+	"""
+	Spawns still projectiles at random positions on the floor of the map, so the sprites are measured in bulk as well.
+	:param game: The instance of the Game.
+	:param amount: The amount of projectiles.
+	:param seed: The seed of the random positions.
+	"""
+	generator = np.random.default_rng(seed)
+	x = generator.uniform(1, game.map.map_size[0] - 1, amount * 4)
+	y = generator.uniform(1, game.map.map_size[1] - 1, amount * 4)
+	free = game.map.grid[x.astype(np.int32), y.astype(np.int32)] == 0
+	x, y = x[free][:amount], y[free][:amount]
+	game.objects_handler.projectiles.spawn(x, y, np.zeros(x.shape), np.zeros(y.shape))
+
+
+def benchmark(game, backend_name: str, poses: list) -> float:
+	"""
+	Renders a frame of the 3D view for each of the given poses, one after the other.
+	:param game: The instance of the Game.
+	:param backend_name: The name of the backend rendering the frames.
+	:param poses: The positions and angles of the player.
+	:return: The median time it took to render a frame, in milliseconds.
+	"""
+	game.render_backend = get_backend(game, backend_name)
+	game.object_renderer.column_cache.clear()
+	game.object_renderer.sprite_cache.clear()
+	times = []
+	for game.player.x, game.player.y, game.player.angle in poses:
+		start = time.perf_counter()
+		game.render_stats.new_frame()
+		game.raycasting.update()
+		for sprite in game.objects_handler.sprites_list + game.objects_handler.entities:
+			sprite.get_sprite()
+		if game.objects_handler.projectiles.count:
+			game.objects_handler.projectiles.get_sprites()
+		game.object_renderer.draw()
+		times.append((time.perf_counter() - start) * 1000)
+	return float(np.median(times))
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Measures the render time of the backends while the camera moves.")
+	parser.add_argument(
+		"backends", nargs="*", default=[SETTINGS.graphics.render_backend],
+		help=f"The backends to measure, among {', '.join(BACKENDS)}."
+	)
+	parser.add_argument("--frames", type=int, default=200, help="The amount of frames of each motion.")
+	parser.add_argument("--seed", type=int, default=0, help="The seed of the start of the motions and of the game.")
+	parser.add_argument("--projectiles", type=int, default=0, help="The amount of still projectiles on the map.")
+	arguments = parser.parse_args()
+
+	random.seed(arguments.seed)
+	game = Game()
+	game.is_3D = True
+	game.player.rel = 0
+	motions = get_motions(game, arguments.frames, arguments.seed)
+	spawn_projectiles(game, arguments.projectiles, arguments.seed)
+
+	print(f"{'backend':>10}" + "".join(f"{name + ' ms':>10}" for name in motions))
+	for name in arguments.backends:
+		print(f"{name:>10}" + "".join(f"{benchmark(game, name, poses):>10.2f}" for poses in motions.values()))
+	sys.exit(0)
@@ -0,0 +1,129 @@
+"""
+Renders the same scripted poses through two render backends without opening a window, and reports the pixel
+differences and render time of each frame.
+By default the reference is compared to the zbuffer backend, which renders the same pixels. The numpy and surfarray
+backends render the same pixels as well, while the spans backend approximates the walls, so it needs a tolerance.
+Usage : python compare_backends.py [backend] [other backend] [--poses N] [--seed S] [--tolerance T]
+"""
+import os
+# Renders without a window nor sound
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import math
+import random
+import sys
+import time
+import numpy as np
+import pygame
+
+from settings import SETTINGS
+from render_backends import BACKENDS, RenderBackend, get_backend
+from main import Game
+
+
+def get_poses(game, amount: int, seed: int) -> list:
+	"""
+	Returns the scripted poses of the comparison : random positions on the floor of the map, each seen again without
+	moving, then turned by a whole amount of rays, then turned freely, so the reuse of the rays is compared as well.
+	:param game: The instance of the Game.
+	:param amount: The amount of random positions.
+	:param seed: The seed of the random positions.
+	:return: A list of (x, y, angle).
+	"""
+	generator = random.Random(seed)
+	poses = []
+	while len(poses) < amount * 4:
+		x = generator.uniform(1, game.map.map_size[0] - 1)
+		y = generator.uniform(1, game.map.map_size[1] - 1)
+		if (int(x), int(y)) in game.map.world_map:
+			continue
+		angle = generator.uniform(0, math.tau)
+		poses.extend((
+			(x, y, angle),
+			(x, y, angle),
+			(x, y, angle + 7 * SETTINGS.graphics.delta_angle),
+			(x, y, angle + 0.1)
+		))
+	return poses
+
+
+def render(game, backend: RenderBackend, poses: list):
+	"""
+	Renders a frame of the 3D view through the given backend for each of the given poses, one after the other.
+	:param game: The instance of the Game.
+	:param backend: The backend rendering the frames.
+	:param poses: The positions and angles of the player.
+	:return: A generator of the pixels of each frame, and the time it took to render in milliseconds.
+	"""
+	game.render_backend = backend
+	for game.player.x, game.player.y, game.player.angle in poses:
+		start = time.perf_counter()
+		game.raycasting.update()
+		for sprite in game.objects_handler.sprites_list + game.objects_handler.entities:
+			sprite.get_sprite()
+		game.object_renderer.draw()
+		elapsed = (time.perf_counter() - start) * 1000
+
+		yield pygame.surfarray.array3d(game.rendering_surface), elapsed
+
+
+def compare(first_name: str, second_name: str, poses: int, seed: int, tolerance: int) -> bool:
+	"""
+	Renders the scripted poses through both backends, and prints the differences and timings of each frame.
+	:param first_name: The name of the first backend, usually the reference.
+	:param second_name: The name of the backend compared to it.
+	:param poses: The amount of random positions to render.
+	:param seed: The seed of the random positions and of the game.
+	:param tolerance: How many pixels of a frame can differ before the frame is reported as a mismatch.
+	:return: Whether every frame matched.
+	"""
+	random.seed(seed)
+	game = Game()
+	game.is_3D = True
+	game.player.rel = 0
+	first, second = get_backend(game, first_name), get_backend(game, second_name)
+	poses = get_poses(game, poses, seed)
+
+	# Renders every pose once through each backend to fill the caches, then times a second pass
+	for backend in (first, second):
+		for _ in render(game, backend, poses):
+			pass
+	first_frames = list(render(game, first, poses))
+
+	print(f"{'frame':>5} {'pixels':>8} {'max diff':>8} {first_name + ' ms':>14} {second_name + ' ms':>14}")
+	mismatches, first_times, second_times = 0, [], []
+	for frame, ((first_pixels, first_time), (second_pixels, second_time)) in enumerate(
+		zip(first_frames, render(game, second, poses))
+	):
+		first_times.append(first_time)
+		second_times.append(second_time)
+
+		difference = np.abs(first_pixels.astype(np.int16) - second_pixels)
+		different_pixels = int(np.count_nonzero(difference.any(axis=2)))
+		mismatches += different_pixels > tolerance
+		print(
+			f"{frame:>5} {different_pixels:>8} {int(difference.max()):>8} {first_time:>14.2f} {second_time:>14.2f}"
+			+ ("  MISMATCH" if different_pixels > tolerance else "")
+		)
+
+	print(
+		f"{mismatches} mismatching frames out of {len(first_times)}, "
+		f"{first_name} {np.mean(first_times):.2f} ms, {second_name} {np.mean(second_times):.2f} ms per frame "
+		f"(x{np.mean(first_times) / np.mean(second_times):.2f})"
+	)
+	return mismatches == 0
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Compares the frames rendered by two render backends.")
+	parser.add_argument("first", nargs="?", default="reference", choices=BACKENDS)
+	parser.add_argument("second", nargs="?", default="zbuffer", choices=BACKENDS)
+	parser.add_argument("--poses", type=int, default=10, help="The amount of random positions to render.")
+	parser.add_argument("--seed", type=int, default=0, help="The seed of the random positions and of the game.")
+	parser.add_argument(
+		"--tolerance", type=int, default=0, help="How many pixels of a frame can differ before it is a mismatch."
+	)
+	arguments = parser.parse_args()
+	sys.exit(0 if compare(arguments.first, arguments.second, arguments.poses, arguments.seed, arguments.tolerance) else 1)
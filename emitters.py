@@ -0,0 +1,195 @@
+"""
+Contains the bullet pattern emitters, declared in JSON by the maps and their enemies.
+An emitter is a dictionary with the name of its pattern and its parameters, e.g. :
+	{"pattern": "spiral", "pos": [5.5, 4.5], "count": 3, "rate": [[0, 2], [10, 8]], "speed": 2.5, "spin": 12}
+The maps declare the emitters standing on their own in their "emitters" list (with a "pos"), and the emitters of all
+their enemies in the "emitters" list of their "enemies" section, or per enemy in "fixed_enemy_spawns".
+"""
+import numpy as np
+import math
+import time
+from typing import Union
+
+from projectiles import PROJECTILE_TYPES
+
+
+# The index of each type of projectile, by name
+PROJECTILE_KINDS = {kind["name"]: i for i, kind in enumerate(PROJECTILE_TYPES)}
+
+
+def ring(volleys: np.ndarray, count: int, spread: float) -> np.ndarray:
+	"""
+	Projectiles evenly spaced all around the emitter.
+	:return: The angle of each projectile of each volley, relative to the direction of the emitter.
+	"""
+	return np.broadcast_to(np.arange(count) * math.tau / count, (len(volleys), count))
+
+
+def fan(volleys: np.ndarray, count: int, spread: float) -> np.ndarray:
+	"""
+	Projectiles evenly spaced within the spread, centered on the direction of the emitter.
+	:return: The angle of each projectile of each volley, relative to the direction of the emitter.
+	"""
+	angles = np.linspace(-spread / 2, spread / 2, count) if count > 1 else np.zeros(1)
+	return np.broadcast_to(angles, (len(volleys), count))
+
+
+def burst(volleys: np.ndarray, count: int, spread: float) -> np.ndarray:
+	"""
+	Projectiles scattered randomly within the spread, centered on the direction of the emitter.
+	:return: The angle of each projectile of each volley, relative to the direction of the emitter.
+	"""
+	return np.random.uniform(-spread / 2, spread / 2, (len(volleys), count))
+
+
+# The shape of each pattern, and its default parameters
+PATTERNS = {
+	"ring": (ring, {"count": 12, "aimed": False, "speed_spread": 0}),
+	# A ring turning by the spin after each volley
+	"spiral": (ring, {"count": 4, "aimed": False, "spin": 15, "speed_spread": 0}),
+	"fan": (fan, {"count": 5, "aimed": True, "spread": 60, "speed_spread": 0}),
+	"burst": (burst, {"count": 8, "aimed": True, "spread": 30, "speed_spread": 0.3})
+}
+
+
+class Curve:
+	"""
+	A value changing over the lifetime of an emitter, declared either as a number or as a list of [time, value]
+	keyframes, the time in seconds, linearly interpolated in between.
+	"""
+	def __init__(self, curve: Union[float, list], period: float = None):
+		"""
+		:param curve: The number or the keyframes of the curve.
+		:param period: The duration after which the curve starts over, in seconds. By default it holds its last value.
+		"""
+		keyframes = np.array(curve if isinstance(curve, list) else [[0, curve]], dtype=float).reshape(-1, 2)
+		self.times, self.values = keyframes[:, 0], keyframes[:, 1]
+		self.period = period
+
+
+	def __call__(self, age: float) -> float:
+		"""
+		Returns the value of the curve at the given age of the emitter, in seconds.
+		"""
+		if self.period:
+			age %= self.period
+		return float(np.interp(age, self.times, self.values))
+
+
+class Emitter:
+	"""
+	Fires a bullet pattern into the projectile pool : every volley due since the last update is spawned in one batch.
+	"""
+	def __init__(
+			self,
+			game,
+			pattern: str,
+			pos: tuple = None,
+			owner = None,
+			count: int = None,
+			rate: Union[float, list] = 1,
+			speed: Union[float, list] = 3,
+			speed_spread: float = None,
+			spread: float = None,
+			spin: float = None,
+			angle: float = 0,
+			aimed: bool = None,
+			period: float = None,
+			delay: float = 0,
+			duration: float = None,
+			kind: str = None,
+			noclip: bool = False
+	):
+		"""
+		:param game: The instance of the Game.
+		:param pattern: The name of the pattern, either "ring", "spiral", "fan" or "burst".
+		:param pos: The position of the emitter, if it does not follow an owner.
+		:param owner: The object the emitter fires from, with x and y attributes, like an entity.
+		:param count: The amount of projectiles per volley, default depends on the pattern.
+		:param rate: The amount of volleys per second, as a number or a curve.
+		:param speed: The speed of the projectiles in tiles per second, as a number or a curve.
+		:param speed_spread: The fraction of their speed the projectiles can randomly lose, default depends on the pattern.
+		:param spread: The angle covered by the fans and bursts in degrees, default depends on the pattern.
+		:param spin: The angle the pattern turns by after each volley in degrees, default depends on the pattern.
+		:param angle: The direction of the emitter in degrees, relative to the player if aimed.
+		:param aimed: Whether the emitter faces the player, default depends on the pattern.
+		:param period: The duration after which the curves start over, in seconds. By default they hold their last value.
+		:param delay: The time before the first volley, in seconds.
+		:param duration: The time the emitter fires for, in seconds. By default it never stops.
+		:param kind: The name of the type of the projectiles, by default depends on noclip like the aimed fireballs.
+		:param noclip: Whether the projectiles go through walls.
+		"""
+		if pattern not in PATTERNS:
+			raise ValueError(f"Unknown bullet pattern '{pattern}', expected one of {', '.join(PATTERNS)}")
+		if owner is None and pos is None:
+			raise ValueError("An emitter needs either a position or an owner")
+		self.game = game
+		self.shape, defaults = PATTERNS[pattern]
+		self.pattern = pattern
+		self.x, self.y = pos if pos is not None else (owner.x, owner.y)
+		self.owner = owner
+
+		self.count = count if count is not None else defaults["count"]
+		self.rate = Curve(rate, period)
+		self.speed = Curve(speed, period)
+		self.speed_spread = speed_spread if speed_spread is not None else defaults["speed_spread"]
+		self.spread = math.radians(spread if spread is not None else defaults.get("spread", 0))
+		self.spin = math.radians(spin if spin is not None else defaults.get("spin", 0))
+		self.angle = math.radians(angle)
+		self.aimed = aimed if aimed is not None else defaults["aimed"]
+		self.delay = delay
+		self.duration = duration
+		self.kind = PROJECTILE_KINDS[kind] if kind is not None else None
+		self.noclip = noclip
+
+		# The time the emitter has been firing for in seconds, the fraction of the next volley already charged, and the
+		# amount of volleys fired
+		self.age = -delay
+		self.charge = 0
+		self.volleys = 0
+
+
+	@property
+	def finished(self) -> bool:
+		"""
+		Whether the emitter is done firing.
+		"""
+		return self.duration is not None and self.age >= self.duration
+
+
+	def update(self):
+		"""
+		Fires the volleys due since the last update, all in one batch.
+		"""
+		# Holds fire during the title screen
+		if time.time() - self.game.start_time <= self.game.map.TITLE_SCREEN_DURATION:
+			return None
+		if self.owner is not None:
+			self.x, self.y = self.owner.x, self.owner.y
+		self.age += self.game.delta_time / 1000
+		if self.age < 0 or self.finished:
+			return None
+
+		# Charges the next volleys at the current rate
+		self.charge += self.rate(self.age) * self.game.delta_time / 1000
+		volleys = int(self.charge)
+		if volleys == 0:
+			return None
+		self.charge -= volleys
+
+		# The direction of each projectile of each volley
+		direction = self.angle
+		if self.aimed:
+			direction += math.atan2(self.game.player.y - self.y, self.game.player.x - self.x)
+		indices = np.arange(self.volleys, self.volleys + volleys)
+		angles = direction + self.spin * indices[:, None] + self.shape(indices, self.count, self.spread)
+		self.volleys += volleys
+
+		# Converts the speed from tiles per second to tiles per millisecond, like the projectile pool
+		speeds = np.full(angles.shape, self.speed(self.age) / 1000)
+		if self.speed_spread:
+			speeds *= 1 - np.random.uniform(0, self.speed_spread, angles.shape)
+
+		self.game.objects_handler.projectiles.spawn(
+			self.x, self.y, np.cos(angles) * speeds, np.sin(angles) * speeds, noclip=self.noclip, kind=self.kind
+		)
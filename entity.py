@@ -2,13 +2,13 @@ import pygame
 import math
 from random import randint, choice, uniform
 import time
-from typing import Tuple, Union
+from typing import Tuple, Union, List
 
 from settings import SETTINGS
 from sprite_object import AnimatedSprite, VFX
 from pickups import Ammo, Health
+from emitters import Emitter
 from utils import distance
-from fireball import Fireball
 
 
 class Entity(AnimatedSprite):
@@ -25,7 +25,8 @@ class Entity(AnimatedSprite):
 			no_ai: bool = False,
 			fleer: bool = False,
 			play_appear_sound: bool = False,
-			speed: float = 0.015
+			speed: float = 0.015,
+			emitters: List[dict] = None
 	):
 		"""
 		:param time_to_fire: The time it takes for the entity to fire an aimed projectile at the player.
@@ -33,6 +34,7 @@ class Entity(AnimatedSprite):
 		:param no_ai: Whether the entity should not possess an AI.
 		:param fleer: Whether the entity is a fleer ; if so, will run away from the player instead of coming to them.
 		:param play_appear_sound: Whether to play the sound of an entity appearing.
+		:param emitters: The bullet patterns the entity fires while it can see the player, instead of aimed projectiles.
 		"""
 		super().__init__(game, path, pos, scale, shift, animation_time, hidden=True, darken=True)
 		# Loads all images for each state
@@ -63,6 +65,7 @@ class Entity(AnimatedSprite):
 		self.no_ai = no_ai
 		self.fleer = fleer
 		self._last_fireball_time = time.time()
+		self.emitters = [Emitter(game, owner=self, **emitter) for emitter in emitters or []]
 
 		# Loads the pain sound
 		self.game.sound.load_sound("enemy_pain", self.game.sound.sounds_path + 'npc_pain.wav', "entity")
@@ -91,7 +94,7 @@ class Entity(AnimatedSprite):
 		# 		and self.game.is_3D is False:
 		# 	self.draw_ray_cast(True)
 		if self.game.is_3D is False and self.alive:
-			pygame.draw.circle(
+			self.game.dirty_rects.append(pygame.draw.circle(
 				self.game.screen,
 				(255, 0, 0),
 				(
@@ -99,7 +102,7 @@ class Entity(AnimatedSprite):
 					self.y * self.game.map.tile_size
 				),
 				10
-			)
+			))
 
 	def check_wall(self, x:int, y:int) -> bool:
 		"""
@@ -127,7 +130,7 @@ class Entity(AnimatedSprite):
 			next_pos = self.game.player.map_pos
 			next_x, next_y = next_pos
 			angle = math.atan2(next_y + 0.5 - self.y, next_x + 0.5 - self.x)
-			if next_pos in self.game.objects_handler.entity_positions:
+			if self.game.objects_handler.has_living_entity(next_pos):
 				direction = pygame.Vector2(0, 0)
 			else:
 				direction = pygame.Vector2(math.cos(angle) * self.speed, math.sin(angle) * self.speed)
@@ -146,29 +149,31 @@ class Entity(AnimatedSprite):
 		"""
 		if self.alive:
 			# Keeps in mind if the entity can see the player
-			self.can_see_player = self.ray_cast_player_to_entity()
+			self.can_see_player = self.game.objects_handler.line_of_sight.can_see_player(self)
 
 			# Checks if the entity was hit
 			self.check_hit_by_player()
 
+			# Fires the bullet patterns of the entity while it can see the player
+			if self.emitters:
+				if self.can_see_player:
+					for emitter in self.emitters:
+						emitter.update()
+
 			# Random chance we spawn a fireball
-			if self.player_far_enough <= self.time_to_fire and randint(
+			elif self.player_far_enough <= self.time_to_fire and randint(
 					0, len(self.game.objects_handler.entities) * 6) == 0 and (
 				time.time() - self._last_fireball_time >= self.game.map.map_data["enemies"]["min_fire_delay"]
 			) and self.game.start_time > self.game.map.TITLE_SCREEN_DURATION:
-				self.game.objects_handler.sprites_list.append(
-					Fireball(
-						self.game,
-						pos=(self.x, self.y),
-						direction=pygame.math.Vector2(
-							self.player.x - self.x,
-							self.player.y - self.y
-						).normalize() / 300 + pygame.math.Vector2(
-							uniform(-self.inaccuracy, self.inaccuracy),
-							uniform(-self.inaccuracy, self.inaccuracy)
-						),
-						noclip=randint(0, 100) < 5
-					)
+				direction = pygame.math.Vector2(
+					self.player.x - self.x,
+					self.player.y - self.y
+				).normalize() / 300 + pygame.math.Vector2(
+					uniform(-self.inaccuracy, self.inaccuracy),
+					uniform(-self.inaccuracy, self.inaccuracy)
+				)
+				self.game.objects_handler.projectiles.spawn(
+					self.x, self.y, direction.x, direction.y, noclip=randint(0, 100) < 5
 				)
 				self._last_fireball_time = time.time()
 
@@ -186,20 +191,15 @@ class Entity(AnimatedSprite):
 					self.player_far_enough += self.game.delta_time
 
 				# If the player has been far away from the entity too long, sending a fireball in his direction
-				if self.player_far_enough > self.time_to_fire and self.game.start_time > self.game.map.TITLE_SCREEN_DURATION:
-					self.game.objects_handler.sprites_list.append(
-						Fireball(
-							self.game,
-							pos = (self.x, self.y),
-							direction = pygame.math.Vector2(
-								self.player.x - self.x,
-								self.player.y - self.y
-							).normalize() / 300 + pygame.math.Vector2(
-								uniform(-self.inaccuracy, self.inaccuracy),
-								uniform(-self.inaccuracy, self.inaccuracy)
-							)
-						)
+				if self.player_far_enough > self.time_to_fire and not self.emitters and self.game.start_time > self.game.map.TITLE_SCREEN_DURATION:
+					direction = pygame.math.Vector2(
+						self.player.x - self.x,
+						self.player.y - self.y
+					).normalize() / 300 + pygame.math.Vector2(
+						uniform(-self.inaccuracy, self.inaccuracy),
+						uniform(-self.inaccuracy, self.inaccuracy)
 					)
+					self.game.objects_handler.projectiles.spawn(self.x, self.y, direction.x, direction.y)
 					self.player_far_enough = 0
 
 			# Otherwise, just idles there
@@ -208,7 +208,7 @@ class Entity(AnimatedSprite):
 
 		else:
 			if time.time() - self._death_time > 15:
-				self.game.objects_handler.entities.remove(self)
+				self.game.objects_handler.remove_entity(self)
 				return None
 			self.animate_death()
 
@@ -308,100 +308,6 @@ class Entity(AnimatedSprite):
 		return int(self.x), int(self.y)
 
 
-	def ray_cast_player_to_entity(self) -> bool:
-		"""
-		Casts a ray in every direction from the player's FOV to render the map.
-		"""
-		# If the player is in the same tile as the entity
-		if self.game.player.map_pos == self.map_pos:
-			return True
-
-		# Keeps in mind the distances to the walls (for the player and the npc)
-		wall_distance_vertical, wall_distance_horizontal = 0, 0
-		player_distance_vertical, player_distance_horizontal = 0, 0
-
-		# Original position of the player on the map at the start of the frame
-		original_position_x, original_position_y = self.game.player.pos
-		# Coordinates of the tile the player is on
-		map_position_x, map_position_y = self.game.player.map_pos
-
-		# Calculates the angle of the raycast, based on the player's rotation angle, half FOV, and a small value to
-		# avoid divisions by zero
-		ray_angle = self.theta
-
-		# Precalculates the sine and cosine of the ray's angle
-		sin_a, cos_a = math.sin(ray_angle), math.cos(ray_angle)
-		if sin_a == 0:
-			sin_a = 1e-6
-		if cos_a == 0:
-			cos_a = 1e-6
-
-		# Determines the intersections of horizontal tiles
-		horizontal_y, direction_y = (map_position_y + 1, 1) if sin_a > 0 else (map_position_y - 1e-6, -1)
-
-		# Calculates the depth of the horizontal
-		depth_horizontal = (horizontal_y - original_position_y) / sin_a
-		horizontal_x = original_position_x + depth_horizontal * cos_a
-
-		# Calculates the depth
-		delta_depth = direction_y / sin_a
-		direction_x = delta_depth * cos_a
-
-		# Looping for each vertical up to the maximum depth
-		for i in range(SETTINGS.graphics.max_depth):
-			tile_hor = int(horizontal_x), int(horizontal_y)
-			# If we found the player position
-			if tile_hor == self.map_pos:
-				player_distance_horizontal = depth_horizontal
-				break
-			# If we found a wall, we stop the cycle
-			if tile_hor in self.game.map.world_map:
-				wall_distance_horizontal = depth_horizontal
-				break
-
-			# Otherwise, we keep going
-			horizontal_x += direction_x
-			horizontal_y += direction_y
-			depth_horizontal += delta_depth
-
-		# Determines the intersections with the vertical tiles
-		vertical_x, direction_x = (map_position_x + 1, 1) if cos_a > 0 else (map_position_x - 1e-6, -1)
-
-		# Calculates the depth of the vertical
-		depth_vertical = (vertical_x - original_position_x) / cos_a
-		vertical_y = original_position_y + depth_vertical * sin_a
-
-		# Calculates the depth
-		delta_depth = direction_x / cos_a
-		direction_y = delta_depth * sin_a
-
-		# Looping for each vertical up to the maximum depth
-		for i in range(SETTINGS.graphics.max_depth):
-			tile_vert = int(vertical_x), int(vertical_y)
-			# If we found the player position
-			if tile_vert == self.map_pos:
-				player_distance_vertical = depth_vertical
-				break
-			# If we found a wall, we stop the cycle
-			if tile_vert in self.game.map.world_map:
-				wall_distance_vertical = depth_vertical
-				break
-
-			# Otherwise, we keep going
-			vertical_x += direction_x
-			vertical_y += direction_y
-			depth_vertical += delta_depth
-
-		# Gets the max values between the distance to the player and the distance to the wall
-		player_distance = max(player_distance_vertical, player_distance_horizontal)
-		wall_distance = max(wall_distance_vertical, wall_distance_horizontal)
-
-		# Returns whether there is a direct line of sight between the NPC and the player
-		if 0 < player_distance < wall_distance or not wall_distance:
-			return True
-		else:
-			return False
-
 	def draw_ray_cast(self, normalized_ray_only: bool = False):
 		if not normalized_ray_only:
 			pygame.draw.circle(
@@ -411,7 +317,7 @@ class Entity(AnimatedSprite):
 				), 15
 			)
 
-		if self.ray_cast_player_to_entity():
+		if self.game.objects_handler.line_of_sight.can_see_player(self):
 			pygame.draw.line(
 				self.game.screen, 'red', (
 					self.game.map.tile_size * self.player.x,
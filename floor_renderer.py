@@ -0,0 +1,117 @@
+import pygame
+import numpy as np
+
+from settings import SETTINGS
+from fog import Fog
+
+
+class FloorRenderer:
+	"""
+	Renders the textured floor and ceiling of the 3D view, computing the whole screen at once with NumPy.
+	Each row of the screen below the horizon sees the floor at a single distance, mirrored above it for the ceiling.
+	"""
+	def __init__(self, game, fog: Fog):
+		"""
+		:param game: The instance of the Game.
+		:param fog: The distance fog darkening the floor and ceiling.
+		"""
+		self.game = game
+		self.fog = fog
+
+		# The floor and ceiling textures, the ceiling being replaced by the sky if it has no texture
+		self.floor_texture = self.load_texture(SETTINGS.graphics.floor_texture)
+		self.ceiling_texture = None
+		if SETTINGS.graphics.ceiling_texture is not None:
+			self.ceiling_texture = self.load_texture(SETTINGS.graphics.ceiling_texture)
+
+		# The pixels of the textures for each fog band, built on first use
+		self.floor_array = None
+		self.ceiling_array = None
+
+
+	@staticmethod
+	def load_texture(path: str) -> pygame.Surface:
+		"""
+		Loads a floor or ceiling texture at the size of the wall textures.
+		:param path: The path to the texture.
+		:return: The loaded and scaled texture.
+		"""
+		return pygame.transform.scale(
+			pygame.image.load(path).convert_alpha(),
+			(SETTINGS.graphics.texture_size, SETTINGS.graphics.texture_size)
+		)
+
+
+	def build_texture_array(self, texture: pygame.Surface) -> np.ndarray:
+		"""
+		Builds the pixel array of a texture in the format of the rendering surface, one copy per fog band.
+		The result is flattened, indexed by (band * texture size + u) * texture size + v.
+		:param texture: The texture.
+		"""
+		arrays = []
+		for band in range(self.fog.bands):
+			# Always darkened, so the fog can be toggled without rebuilding the arrays
+			surface = texture.convert(self.game.rendering_surface)
+			surface.fill(self.fog.colors[band], special_flags=pygame.BLEND_RGBA_SUB)
+			arrays.append(pygame.surfarray.array2d(surface).astype(np.uint32))
+		return np.stack(arrays).ravel()
+
+
+	@property
+	def draws_ceiling(self) -> bool:
+		"""
+		Whether the ceiling is textured, instead of showing the sky.
+		"""
+		return self.ceiling_texture is not None
+
+
+	def draw(self, surface: pygame.Surface):
+		"""
+		Draws the floor, and the ceiling if it is textured, onto the given surface.
+		:param surface: The surface to draw onto, of the size of the screen.
+		"""
+		if self.floor_array is None:
+			self.floor_array = self.build_texture_array(self.floor_texture)
+			if self.draws_ceiling:
+				self.ceiling_array = self.build_texture_array(self.ceiling_texture)
+
+		texture_size = SETTINGS.graphics.texture_size
+		half_height = SETTINGS.graphics.half_height
+		rows = SETTINGS.graphics.resolution[1] - half_height
+
+		# The distance of the floor seen by each row, the camera being half a tile above it
+		distances = 0.5 * SETTINGS.graphics.screen_distance / (np.arange(rows) + 0.5)
+
+		# The direction of each ray, scaled so that it advances by one unit of depth along the player's view
+		ray_angles = (
+			self.game.player.angle - SETTINGS.graphics.fov / 2 + 0.0001
+			+ np.arange(SETTINGS.graphics.num_rays) * SETTINGS.graphics.delta_angle
+		)
+		fishbowl = np.cos(self.game.player.angle - ray_angles)
+		direction_x = (np.cos(ray_angles) / fishbowl).astype(np.float32)
+		direction_y = (np.sin(ray_angles) / fishbowl).astype(np.float32)
+
+		# The texture coordinates of the floor seen by each row of each ray, in single precision as they only need to
+		# be precise to the texel, wrapped using a mask as the texture size is a power of two
+		texel_distances = (distances * texture_size).astype(np.float32)
+		u = (np.float32(self.game.player.x * texture_size) + direction_x[:, None] * texel_distances).astype(np.int32)
+		v = (np.float32(self.game.player.y * texture_size) + direction_y[:, None] * texel_distances).astype(np.int32)
+		u &= texture_size - 1
+		v &= texture_size - 1
+
+		# The index of each texel in the texture arrays, computed in place
+		index = u
+		index *= texture_size
+		index += v
+		index += self.fog.bands_of(distances) * (texture_size * texture_size)
+
+		# The ray rendered by each column of the screen
+		column_rays = np.minimum(
+			np.arange(SETTINGS.graphics.resolution[0]) // SETTINGS.graphics.scale, SETTINGS.graphics.num_rays - 1
+		)
+
+		pixels = pygame.surfarray.pixels2d(surface)
+		pixels[:, half_height:] = self.floor_array.take(index)[column_rays]
+		if self.draws_ceiling:
+			pixels[:, :half_height] = self.ceiling_array.take(index[:, half_height - 1::-1])[column_rays]
+		del pixels
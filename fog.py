@@ -0,0 +1,63 @@
+import pygame
+import numpy as np
+
+from settings import SETTINGS
+
+
+class Fog:
+	"""
+	Darkens the surfaces based on their depth, using a fixed amount of precomputed distance bands.
+	"""
+	def __init__(self, bands: int = SETTINGS.graphics.fog_bands, multiplier: float = 2):
+		"""
+		:param bands: The amount of distance bands between the camera and the max depth, default is defined in
+		settings.json
+		:param multiplier: How much the surfaces get darkened per unit of depth, default is 2.
+		"""
+		self.bands = bands
+		self.multiplier = multiplier
+
+		# Each band covers the same range of darkening, from the camera to the max depth
+		self.band_size = SETTINGS.graphics.max_depth * multiplier / bands
+
+		# The lookup table of the color subtracted from the surfaces for each band (middle of the band's range)
+		self.colors = []
+		for band in range(bands):
+			darkening = min(int((band + 0.5) * self.band_size), 255)
+			self.colors.append((darkening, darkening, darkening, 0))
+
+
+	def band(self, depth: float, light: int = 0) -> int:
+		"""
+		Returns the fog band in which a surface placed at the given depth falls (always 0 if depth darkening is off).
+		:param depth: The depth at which the surface will be placed in 3D space.
+		:param light: The light level of the surface's tile, each level bringing it one band closer, default is 0.
+		"""
+		if SETTINGS.graphics.advanced_depth_darkening:
+			return max(min(int(depth * self.multiplier / self.band_size), self.bands - 1) - light, 0)
+		return 0
+
+
+	def bands_of(self, depths: np.ndarray, lights: np.ndarray = 0) -> np.ndarray:
+		"""
+		Returns the fog band of each of the given depths at once.
+		:param depths: An array of depths in 3D space.
+		:param lights: The light level of each depth's tile, or a single level for all of them, default is 0.
+		"""
+		if SETTINGS.graphics.advanced_depth_darkening:
+			return np.maximum(
+				np.minimum((depths * self.multiplier / self.band_size).astype(np.int32), self.bands - 1) - lights, 0
+			)
+		return np.zeros(depths.shape, dtype=np.int32)
+
+
+	def apply(self, surf: pygame.Surface, band: int) -> pygame.Surface:
+		"""
+		Darkens the given surface in place, without allocating any other surface.
+		:param surf: The surface to darken.
+		:param band: The fog band of the surface.
+		:return: The darkened surface.
+		"""
+		if SETTINGS.graphics.advanced_depth_darkening:
+			surf.fill(self.colors[band], special_flags=pygame.BLEND_RGBA_SUB)
+		return surf
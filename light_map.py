@@ -0,0 +1,124 @@
+import numpy as np
+from typing import Tuple
+
+from settings import SETTINGS
+
+
+class LightMap:
+	"""
+	The light level of each tile of the map, added by the light sources (flames, fireballs, muzzle flashes) with a
+	falloff around them.
+	The levels are updated incrementally : only the tiles around a source that appeared, disappeared or moved to another
+	tile are changed, so a light costs nothing while it stays in its tile.
+	A level of light removes one band of distance fog from the walls and sprites in the tile.
+	"""
+	def __init__(self, game):
+		"""
+		:param game: The instance of the Game.
+		"""
+		self.game = game
+
+		# The light added to each tile by every source, and the same light rounded down to whole fog bands
+		self.levels = np.zeros(self.game.map.grid.shape, dtype=np.float32)
+		self.bands = np.zeros(self.game.map.grid.shape, dtype=np.int32)
+
+		# The tile, intensity and radius of each source currently lighting the map
+		self.sources = {}
+
+		# The light added around a source, for each intensity and radius
+		self._falloffs = {}
+
+		# Incremented every time the light of a tile changes, so the renderers know when to shade again
+		self.version = 0
+
+
+	def set_light(self, source, tile: Tuple[int, int], intensity: float, radius: int):
+		"""
+		Lights the tiles around the given tile, replacing the light the source was emitting before.
+		Does nothing if the source has not changed tile.
+		:param source: Any object emitting light, used as the key of the light.
+		:param tile: The tile the source is in.
+		:param intensity: The light added to the source's tile, in fog bands.
+		:param radius: How many tiles around the source get lit.
+		"""
+		light = (tile, intensity, radius)
+		if self.sources.get(source) == light:
+			return None
+
+		self.remove_light(source)
+		self.sources[source] = light
+		self._add(light, 1)
+
+
+	def remove_light(self, source):
+		"""
+		Removes the light emitted by the given source, if it was emitting any.
+		:param source: The object emitting light.
+		"""
+		light = self.sources.pop(source, None)
+		if light is not None:
+			self._add(light, -1)
+
+
+	def _add(self, light: tuple, sign: int):
+		"""
+		Adds or removes the light of a source to the tiles around it.
+		:param light: The tile, intensity and radius of the source.
+		:param sign: 1 to add the light, -1 to remove it.
+		"""
+		(x, y), intensity, radius = light
+		falloff = self.get_falloff(intensity, radius)
+
+		# Only the part of the falloff within the map is applied
+		left, top = max(x - radius, 0), max(y - radius, 0)
+		right, bottom = min(x + radius + 1, self.levels.shape[0]), min(y + radius + 1, self.levels.shape[1])
+		if left >= right or top >= bottom:
+			return None
+		falloff = falloff[left - x + radius:right - x + radius, top - y + radius:bottom - y + radius]
+
+		self.levels[left:right, top:bottom] += sign * falloff
+		# Rounded with a margin, so adding then removing a light always brings the bands back
+		self.bands[left:right, top:bottom] = (self.levels[left:right, top:bottom] + 1e-3).astype(np.int32)
+
+		self.version += 1
+		self.game.render_stats.count("light tiles", falloff.size)
+
+
+	def get_falloff(self, intensity: float, radius: int) -> np.ndarray:
+		"""
+		Returns the light added to the tiles around a source, decreasing linearly with the distance to its tile.
+		:param intensity: The light added to the source's tile.
+		:param radius: How many tiles around the source get lit.
+		:return: An array of shape (2 * radius + 1, 2 * radius + 1), centered on the source's tile.
+		"""
+		if (intensity, radius) not in self._falloffs:
+			offsets = np.arange(-radius, radius + 1)
+			distances = np.hypot(offsets[:, None], offsets[None, :])
+			self._falloffs[(intensity, radius)] = (
+				intensity * np.clip(1 - distances / (radius + 1), 0, None)
+			).astype(np.float32)
+		return self._falloffs[(intensity, radius)]
+
+
+	def light_at(self, x: float, y: float) -> int:
+		"""
+		Returns the light level of the tile at the given position (0 outside the map or if lighting is off).
+		:param x: The x coordinate of the position.
+		:param y: The y coordinate of the position.
+		"""
+		if SETTINGS.graphics.dynamic_lighting and 0 <= x < self.bands.shape[0] and 0 <= y < self.bands.shape[1]:
+			return int(self.bands[int(x), int(y)])
+		return 0
+
+
+	def lights_of(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+		"""
+		Returns the light level of the tiles at each of the given positions at once.
+		:param x: The x coordinates of the positions.
+		:param y: The y coordinates of the positions.
+		"""
+		if not SETTINGS.graphics.dynamic_lighting:
+			return np.zeros(np.shape(x), dtype=np.int32)
+		x = np.clip(x, 0, self.bands.shape[0] - 1).astype(np.int32)
+		y = np.clip(y, 0, self.bands.shape[1] - 1).astype(np.int32)
+		return self.bands[x, y]
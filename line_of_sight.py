@@ -0,0 +1,125 @@
+import numpy as np
+
+
+def trace(grid: np.ndarray, origin_x, origin_y, x: np.ndarray, y: np.ndarray, blocks=None) -> np.ndarray:
+	"""
+	Returns whether there is no wall between each pair of positions.
+	Every line is a DDA walking the tiles between its ends, all the lines stepping together against the grid.
+	The tiles at both ends of the lines are not checked.
+	:param grid: The grid of the map, indexed as grid[x, y].
+	:param origin_x: The x coordinates the lines start from, a single value or one per line.
+	:param origin_y: The y coordinates the lines start from, a single value or one per line.
+	:param x: The x coordinates the lines end at.
+	:param y: The y coordinates the lines end at.
+	:param blocks: Returns which of the lines walking into a wall are stopped by it, given the indices of the lines and
+	the coordinates of their walls. By default every wall stops every line.
+	"""
+	origin_x, origin_y, x, y = (array.astype(float) for array in np.broadcast_arrays(origin_x, origin_y, x, y))
+	delta_x, delta_y = x - origin_x, y - origin_y
+
+	# The tile each line is in, the tile it ends in, and the direction it goes along each axis
+	tile_x, tile_y = np.floor(origin_x).astype(np.int32), np.floor(origin_y).astype(np.int32)
+	target_x, target_y = np.floor(x).astype(np.int32), np.floor(y).astype(np.int32)
+	step_x, step_y = np.sign(delta_x).astype(np.int32), np.sign(delta_y).astype(np.int32)
+
+	# The distance along each line to its next vertical and horizontal tile borders, as a fraction of its length,
+	# and how much it increases with each border crossed
+	with np.errstate(divide="ignore", invalid="ignore"):
+		span_x, span_y = np.abs(1 / delta_x), np.abs(1 / delta_y)
+		next_x = np.where(step_x > 0, tile_x + 1 - origin_x, origin_x - tile_x) * span_x
+		next_y = np.where(step_y > 0, tile_y + 1 - origin_y, origin_y - tile_y) * span_y
+	next_x[step_x == 0], next_y[step_y == 0] = np.inf, np.inf
+
+	# Each line crosses as many borders as there are tiles between its ends, and every tile before the last one
+	# has to be empty. Only the lines still walking are kept at each step
+	steps = np.abs(target_x - tile_x) + np.abs(target_y - tile_y)
+	visible = np.ones(x.shape, dtype=bool)
+	lines = np.flatnonzero(steps > 1)
+	tile_x, tile_y, next_x, next_y = tile_x[lines], tile_y[lines], next_x[lines], next_y[lines]
+	span_x, span_y, step_x, step_y, steps = span_x[lines], span_y[lines], step_x[lines], step_y[lines], steps[lines]
+	for i in range(int(steps.max(initial=0)) - 1):
+		crosses_x = next_x < next_y
+		crosses_y = ~crosses_x
+		tile_x += np.where(crosses_x, step_x, 0)
+		next_x += np.where(crosses_x, span_x, 0)
+		tile_y += np.where(crosses_y, step_y, 0)
+		next_y += np.where(crosses_y, span_y, 0)
+
+		inside = (tile_x >= 0) & (tile_x < grid.shape[0]) & (tile_y >= 0) & (tile_y < grid.shape[1])
+		walls = np.zeros(lines.shape, dtype=bool)
+		walls[inside] = grid[tile_x[inside], tile_y[inside]] != 0
+		if blocks is not None and walls.any():
+			hits = np.flatnonzero(walls)
+			walls[hits] = blocks(lines[hits], tile_x[hits], tile_y[hits])
+		visible[lines[walls]] = False
+
+		walking = ~walls & (i + 2 < steps)
+		if not walking.all():
+			lines, tile_x, tile_y, next_x, next_y = (
+				lines[walking], tile_x[walking], tile_y[walking], next_x[walking], next_y[walking]
+			)
+			span_x, span_y, step_x, step_y, steps = (
+				span_x[walking], span_y[walking], step_x[walking], step_y[walking], steps[walking]
+			)
+			if not lines.size:
+				break
+	return visible
+
+
+class LineOfSight:
+	"""
+	Computes whether the player can see each entity and projectile, all at once, once per frame.
+	The pairs of tiles which can never see each other are rejected with the potentially visible set of the map, and the
+	lines of the other ones are traced all together.
+	"""
+	def __init__(self, game):
+		"""
+		:param game: The instance of the Game.
+		"""
+		self.game = game
+
+		# Whether each entity can see the player, and each alive projectile in the order of the projectile pool, as of
+		# the last update
+		self.entities = {}
+		self.projectiles = np.zeros(0, dtype=bool)
+
+
+	def update(self):
+		"""
+		Computes the lines of sight of every living entity and every projectile in a single pass.
+		"""
+		entities = [entity for entity in self.game.objects_handler.entities if entity.alive]
+		pool = self.game.objects_handler.projectiles
+		x = np.concatenate((np.array([entity.x for entity in entities], dtype=float), pool.x[:pool.count]))
+		y = np.concatenate((np.array([entity.y for entity in entities], dtype=float), pool.y[:pool.count]))
+
+		visible = self.query(x, y)
+		self.entities = dict(zip(entities, visible[:len(entities)].tolist()))
+		self.projectiles = visible[len(entities):]
+
+
+	def can_see_player(self, entity) -> bool:
+		"""
+		Returns whether there is a direct line of sight between the player and an entity, computed in the last update,
+		or right away for the entities added since.
+		:param entity: The entity, or any object with x and y attributes.
+		"""
+		if entity not in self.entities:
+			self.entities[entity] = bool(self.query(np.array([entity.x]), np.array([entity.y]))[0])
+		return self.entities[entity]
+
+
+	def query(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+		"""
+		Returns whether there is no wall between the player and each of the given positions.
+		:param x: The x coordinates of the positions.
+		:param y: The y coordinates of the positions.
+		"""
+		player_x, player_y = self.game.player.pos
+		visible = self.game.map.pvs.can_see(self.game.player.map_pos, x, y)
+		self.game.render_stats.count("lines of sight rejected", int(np.count_nonzero(~visible)))
+
+		# Only traces the lines the potentially visible set could not reject
+		candidates = np.flatnonzero(visible)
+		visible[candidates] = trace(self.game.map.grid, player_x, player_y, x[candidates], y[candidates])
+		return visible
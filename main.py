@@ -17,11 +17,13 @@ from weapon import Shotgun, Pistol, Fist, ALL_WEAPONS
 from sounds import SoundHandler
 from UI import UI
 from entity import Entity
-from fireball import Fireball
+from render_stats import RenderStats
+from render_backends import get_backend
+from quality_governor import QualityGovernor
+from light_map import LightMap
 
 # TODO : Bulle sans spawn
 # TODO : Contact attack if player too close too long
-# TODO : Parallelise raycast ?
 # TODO : First map
 class Game:
 	"""
@@ -38,6 +40,14 @@ class Game:
 		self.screen = pygame.display.set_mode(SETTINGS.graphics.resolution, flags)
 		self.rendering_surface = pygame.Surface(SETTINGS.graphics.resolution)
 
+		# The rects of the screen drawn onto since the last display update, and the ones of the update before, so the 2D
+		# view only updates the parts of the display that changed
+		self.dirty_rects = []
+		self.last_dirty_rects = []
+
+		# The surface fading the title screen out, reused every frame
+		self.title_screen_blocker = pygame.Surface(SETTINGS.graphics.resolution).convert_alpha()
+
 		# Only authorizes some events for optimization
 		pygame.event.set_allowed([QUIT, KEYDOWN, MOUSEBUTTONDOWN])
 
@@ -75,6 +85,18 @@ class Game:
 		# Loads the player
 		self.player = Player(self)
 
+		# Keeps track of the rendering statistics of each frame
+		self.render_stats = RenderStats()
+
+		# Loads the light map, lit by the sprites and weapons emitting light
+		self.light_map = LightMap(self)
+
+		# Loads the governor adjusting the rendering quality to the frame time
+		self.quality_governor = QualityGovernor(self)
+
+		# Loads the backend rendering the 3D view
+		self.render_backend = get_backend(self)
+
 		# Loads the object renderer
 		self.object_renderer = ObjectRenderer(self)
 
@@ -87,6 +109,7 @@ class Game:
 		# Loads the sprites on the map
 		self.map.load_sprites()
 		self.map.load_enemies()
+		self.map.load_emitters()
 
 		# Loads the weapon
 		self.weapons = [
@@ -105,6 +128,13 @@ class Game:
 			(10, 10),
 			(0, 255, 0)
 		)
+		def update_render_stats_ui_element(game, ui_element):
+			ui_element["text"] = str(game.render_stats) if SETTINGS.graphics.show_render_stats else ""
+		self.UI.create_UI_element(
+			"render_stats", "", "Consolas", 14, update_render_stats_ui_element,
+			(10, 40),
+			(0, 255, 0)
+		)
 		def update_ammo_ui_element(game, ui_element):
 			ui_element["text"] = str(game.weapon.ammo)
 		self.UI.create_UI_element(
@@ -142,6 +172,13 @@ class Game:
 		if self.await_restart:
 			self.new_game()
 
+		# Starts counting the rendering statistics of the new frame
+		self.render_stats.new_frame()
+
+		# Adapts the rendering quality to the time the last frame took
+		if SETTINGS.graphics.adaptive_quality and self.is_3D:
+			self.quality_governor.update()
+
 		if self.player.health > 0:
 			# Updates the map
 			self.map.update()
@@ -174,11 +211,10 @@ class Game:
 			pygame.event.set_grab(False)
 
 		# Erases the pygame display
-		pygame.display.flip()
+		self.update_display()
 
 		# Waits until a new frame has to be drawn and calculates the delta time
 		self.delta_time = self.clock.tick(SETTINGS.graphics.framerate)
-
 		# Displays the game's title with the framerate in the caption
 		pygame.display.set_caption(f"DOOM Style Bullet Hell - {self.clock.get_fps():.1f} FPS")
 
@@ -200,9 +236,6 @@ class Game:
 		"""
 		# If we play in 2D, we render the player and the map
 		if self.is_3D is False:
-			# Fills the screen with the floor color if in 2D
-			self.screen.fill(SETTINGS.graphics.floor_color)
-
 			# Draws the map
 			self.map.draw()
 
@@ -225,9 +258,9 @@ class Game:
 			# Draws the weapon
 			self.weapon.draw()
 
-			# Methods to draw the depth texture and AO
-			# self.screen.blit(self.object_renderer.depth_texture.convert(), (0, 0))
-			# self.screen.blit(self.object_renderer.ambient_occlusion_texture.convert(), (0, 0))
+			# Draws the map in a corner of the screen
+			if SETTINGS.graphics.minimap:
+				self.map.draw_minimap()
 
 		# Draws the UI
 		self.UI.draw()
@@ -235,19 +268,32 @@ class Game:
 		# Displays the title screen
 		time_since_load = time.time() - self.start_time
 		if time_since_load < Map.TITLE_SCREEN_DURATION + Map.TITLE_SCREEN_BLEND_TIME:
-			blocker = pygame.Surface(SETTINGS.graphics.resolution).convert_alpha()
+			blocker = self.title_screen_blocker
 			if time_since_load < Map.TITLE_SCREEN_DURATION:
 				blocker.fill((0, 0, 0))
 			else:
 				time_since_load -= Map.TITLE_SCREEN_DURATION
 				clamp = lambda x: max(0, min(x, 1))  # Makes sure the number is between 0 and 1
 				blocker.fill((0, 0, 0, 255 * clamp(1 - time_since_load / Map.TITLE_SCREEN_DURATION)))
-			self.screen.blit(blocker, (0, 0))
+			self.dirty_rects.append(self.screen.blit(blocker, (0, 0)))
 
 		# Draws the UI
 		self.UI.draw(True)
 
 
+	def update_display(self):
+		"""
+		Shows the frame on the display. In 2D, only the parts of the screen drawn onto since the last update are updated,
+		along with the ones the map restored since.
+		"""
+		if self.is_3D:
+			pygame.display.flip()
+		else:
+			pygame.display.update(self.last_dirty_rects + self.dirty_rects)
+		self.last_dirty_rects = self.dirty_rects
+		self.dirty_rects = []
+
+
 	def check_events(self):
 		"""
 		Checks for events having occurred during the frame.
@@ -267,6 +313,7 @@ class Game:
 				if event.key == getattr(pygame, f"K_{SETTINGS.controls.perspective_change.upper()}"):
 					# Toggles 3D mode
 					self.is_3D = not self.is_3D
+					self.map.redraw = True
 
 					# Hides the mouse if in 3D mode
 					pygame.mouse.set_visible(not pygame.mouse.get_visible())
@@ -1,4 +1,6 @@
 import pygame
+import numpy as np
+import math
 import time
 import os
 import json
@@ -6,6 +8,8 @@ from importlib import import_module
 
 from settings import SETTINGS
 from sprites import ALL_SPRITES
+from emitters import Emitter
+from pvs import PotentiallyVisibleSet
 
 # -- Creates the map --
 # Generates the map's size based on the resolution, best if corresponding to the window's aspect ratio
@@ -50,13 +54,26 @@ class Map:
 		self.tile_size = map_data["tile_size"]
 		self.map_size = (len(self.map[0]) - 1, len(self.map) - 1)
 		self.world_map = {}
+		self.grid = None  # Dense version of the world map, indexed as grid[x, y]
+		self.distance_field = None  # Distance of each tile to the closest wall, indexed as distance_field[x, y]
+		self.empty_distances = {}  # Same distance, only for the empty tiles, keyed like the world map
 		self.get_map()
+		# Whether each tile can see each other tile, cached with the save data
+		self.pvs = PotentiallyVisibleSet(
+			self.grid, os.path.join(SETTINGS.misc.save_location, f"map{game.save_data['current_level']}.pvs.npz")
+		)
 		self.map_title = map_data["map_title"]
 		self.base_enemy_spawn = map_data["base_enemy_spawn"]  # Base amount of enemies on the map
 		self.max_enemies = map_data["max_enemies"]  # Max amount of enemies on the map
 		self.map_data = map_data
 		self.sprites_awaiting_appearance = []
 
+		# The static layer of the 2D map (floor and walls) and its scaled down version for the minimap, rendered on
+		# first use, and whether the whole layer has to be drawn again in the next 2D frame
+		self.layer = None
+		self.minimap = None
+		self.redraw = True
+
 		# Uses the perspective the map wants us to start with
 		self.game.is_3D = not self.map_data["starting_perspective_is_2D"]
 		pygame.event.set_grab(self.game.is_3D)
@@ -96,6 +113,14 @@ class Map:
 				self.sprites_awaiting_appearance.append(sprite)
 
 
+	def load_emitters(self):
+		"""
+		Loads the bullet pattern emitters standing on their own.
+		"""
+		for emitter in self.map_data.get("emitters", []):
+			self.game.objects_handler.add_emitter(Emitter(self.game, **emitter))
+
+
 	def load_enemies(self):
 		"""
 		Loads all the enemies.
@@ -113,17 +138,111 @@ class Map:
 				if value:
 					self.world_map[(i, j)] = value
 
+		# Dense tile grid used by the vectorized raycasting backend (0 means no wall)
+		self.grid = np.array(self.map, dtype=np.int32).T
+
+		# Distance field of the map, allowing the rays to jump across empty regions
+		self.distance_field = self.get_distance_field(self.grid > 0)
+		self.empty_distances = {
+			(i, j): int(self.distance_field[i, j])
+			for i, j in zip(*np.nonzero(self.grid == 0))
+		}
+
+
+	@staticmethod
+	def get_distance_field(walls: np.ndarray) -> np.ndarray:
+		"""
+		Computes the Chebyshev distance (in tiles) from each tile to the closest wall.
+		:param walls: A boolean array of the tiles containing a wall.
+		:return: The distance of each tile to the closest wall, 0 for the walls themselves.
+		"""
+		distance_field = np.where(walls, 0, walls.size)
+		reached = walls.copy()
+		distance = 0
+		# Grows the area around the walls one ring of tiles at a time
+		while not reached.all() and reached.any():
+			distance += 1
+			padded = np.pad(reached, 1)
+			grown = np.zeros_like(reached)
+			for dx in (0, 1, 2):
+				for dy in (0, 1, 2):
+					grown |= padded[dx:dx + reached.shape[0], dy:dy + reached.shape[1]]
+			distance_field[grown & ~reached] = distance
+			reached = grown
+		return distance_field
+
+
+	def empty_space_steps(self, tile: tuple, step_x: float, step_y: float) -> int:
+		"""
+		Returns how many steps a ray standing in the given empty tile can take without being able to meet a wall.
+		:param tile: The empty tile the ray is in.
+		:param step_x: The horizontal distance covered by a step of the ray.
+		:param step_y: The vertical distance covered by a step of the ray.
+		:return: The amount of steps (at least 1). Infinite outside the map, where no wall can ever be met again.
+		"""
+		distance = self.empty_distances.get(tile, math.inf)
+		if distance == math.inf:
+			return distance
+		# Every tile closer than the distance is empty, and a step moves the ray by at most a tile per unit of distance
+		return max(int((distance - 1) / max(abs(step_x), abs(step_y))), 1)
+
+
+	def get_layer(self) -> pygame.Surface:
+		"""
+		Returns the static layer of the 2D map, of the size of the screen, rendering it the first time.
+		"""
+		if self.layer is None:
+			self.layer = pygame.Surface(SETTINGS.graphics.resolution).convert()
+			self.layer.fill(SETTINGS.graphics.floor_color)
+
+			# Each wall texture is only scaled once to the size of the tiles
+			tiles = {
+				value: pygame.transform.scale(texture, (self.tile_size, self.tile_size))
+				for value, texture in self.game.object_renderer.wall_textures.items()
+			}
+			self.layer.fblits([
+				(tiles[value], (pos[0] * self.tile_size, pos[1] * self.tile_size))
+				for pos, value in self.world_map.items()
+			])
+		return self.layer
+
 
 	def draw(self):
 		"""
-		Draws the 2D map on the screen.
+		Draws the 2D map on the screen, only restoring the parts of it drawn over since the last frame.
 		"""
 		if self.game.is_3D is False:
-			for pos, value in self.world_map.items():
-				self.game.screen.blit(
-					pygame.transform.scale(self.game.object_renderer.wall_textures[value], (self.tile_size, self.tile_size)),
-					(pos[0] * self.tile_size, pos[1] * self.tile_size)
-				)
+			if self.redraw:
+				self.game.dirty_rects.append(self.game.screen.blit(self.get_layer(), (0, 0)))
+				self.redraw = False
+			else:
+				layer = self.get_layer()
+				self.game.screen.blits([(layer, rect, rect) for rect in self.game.last_dirty_rects], doreturn=False)
+
+
+	def draw_minimap(self):
+		"""
+		Draws the 2D map layer scaled down in the top right corner of the screen, along with the player's position.
+		"""
+		if self.minimap is None:
+			map_area = pygame.Rect(
+				0, 0, len(self.map[0]) * self.tile_size, len(self.map) * self.tile_size
+			).clip(self.get_layer().get_rect())
+			self.minimap = pygame.transform.smoothscale_by(
+				self.get_layer().subsurface(map_area), SETTINGS.graphics.minimap_scale
+			)
+
+		position = (SETTINGS.graphics.resolution[0] - self.minimap.get_width() - 10, 10)
+		self.game.screen.blit(self.minimap, position)
+		pygame.draw.circle(
+			self.game.screen,
+			'green',
+			(
+				position[0] + self.game.player.x * self.tile_size * SETTINGS.graphics.minimap_scale,
+				position[1] + self.game.player.y * self.tile_size * SETTINGS.graphics.minimap_scale
+			),
+			3
+		)
 
 
 	def update(self):
@@ -1,11 +1,16 @@
 import pygame
+import math
 from random import uniform, randint
-from typing import Tuple
+from typing import Tuple, List
 
 from utils import distance
 from sprite_object import SpriteObject, AnimatedSprite
-from fireball import Fireball
+from projectiles import ProjectilePool
+from emitters import Emitter
+from line_of_sight import LineOfSight
 from entity import Entity
+from pickups import Pickup, PickupAnimated
+from spatial_hash import SpatialHash
 
 
 class ObjectHandler:
@@ -16,7 +21,18 @@ class ObjectHandler:
 		self.game = game
 		self.sprites_list = []
 		self.entities = []
-		self.entity_positions = set()
+		# The sprites and entities bucketed by tile, so the ones around a position are found without going through all
+		# of them
+		self.sprite_grid = SpatialHash()
+		self.entity_grid = SpatialHash()
+		# The largest distance from which a pickup can be picked up, bounding the area searched around the player
+		self.pickup_distance = 0
+		# Every projectile, simulated all at once
+		self.projectiles = ProjectilePool(game)
+		# The bullet patterns standing on their own, the ones of the entities being fired by the entities
+		self.emitters = []
+		# Whether the player can see each entity and projectile, computed for all of them at the start of each frame
+		self.line_of_sight = LineOfSight(game)
 		self.entity_sprite_path = 'assets/entities/'
 		self.static_sprites_path = 'assets/sprites/'
 		self.animated_sprites_path = "assets/animated_sprites/"
@@ -24,7 +40,6 @@ class ObjectHandler:
 		# Sprite creation
 		# self.add_sprite(SpriteObject(game))
 		# self.add_sprite(AnimatedSprite(game))
-		# self.add_sprite(Fireball(game, direction=pygame.math.Vector2(0, 0)))
 		for _ in range(self.game.map.base_enemy_spawn):
 			self.create_enemy(randint(1, 6) == 1, randint(1, 4) == 1)
 
@@ -32,9 +47,26 @@ class ObjectHandler:
 		"""
 		Updates all sprites and entities in the game.
 		"""
-		self.entity_positions = {entity.map_pos for entity in self.entities if entity.alive}
+		self.line_of_sight.update()
 		[sprite.update() for sprite in self.sprites_list]
 		[entity.update() for entity in self.entities]
+		for emitter in self.emitters:
+			emitter.update()
+		self.emitters = [emitter for emitter in self.emitters if not emitter.finished]
+		self.projectiles.update()
+
+		# Moves the objects to the bucket of their new tile
+		for sprite in self.sprites_list:
+			self.sprite_grid.move(sprite)
+		for entity in self.entities:
+			self.entity_grid.move(entity)
+
+		# Only the pickups around the player can be picked up. They are in reach within their distance along each axis
+		# of the player's position rounded to a tenth of a tile, so within the diagonal of that square
+		radius = (self.pickup_distance + 0.05) * math.sqrt(2)
+		for sprite in self.sprite_grid.query_radius(self.game.player.x, self.game.player.y, radius):
+			if isinstance(sprite, (Pickup, PickupAnimated)):
+				sprite.try_pick_up()
 
 	def add_sprite(self, sprite: SpriteObject):
 		"""
@@ -42,6 +74,20 @@ class ObjectHandler:
 		:param sprite: The sprite to add.
 		"""
 		self.sprites_list.append(sprite)
+		self.sprite_grid.insert(sprite)
+		if isinstance(sprite, (Pickup, PickupAnimated)):
+			self.pickup_distance = max(self.pickup_distance, sprite.pickup_distance)
+
+
+	def remove_sprite(self, sprite: SpriteObject):
+		"""
+		Removes a sprite from the handler, if it was not removed already.
+		:param sprite: The sprite to remove.
+		"""
+		try:
+			self.sprites_list.remove(sprite)
+		except ValueError: pass
+		self.sprite_grid.remove(sprite)
 
 
 	def add_entity(self, entity: Entity):
@@ -50,11 +96,40 @@ class ObjectHandler:
 		:param entity: The entity to add.
 		"""
 		self.entities.append(entity)
+		self.entity_grid.insert(entity)
+
+
+	def remove_entity(self, entity: Entity):
+		"""
+		Removes an entity from the handler.
+		:param entity: The entity to remove.
+		"""
+		self.entities.remove(entity)
+		self.entity_grid.remove(entity)
+
+
+	def add_emitter(self, emitter: Emitter):
+		"""
+		Adds a bullet pattern emitter to the handler, firing until it is finished.
+		:param emitter: The emitter to add.
+		"""
+		self.emitters.append(emitter)
+
+
+	def has_living_entity(self, tile: Tuple[int, int]) -> bool:
+		"""
+		Returns whether a living entity stands in the given tile.
+		:param tile: The coordinates of the tile.
+		"""
+		return any(entity.alive for entity in self.entity_grid.query_tile(tile))
 
 
-	def create_enemy(self, no_ai: bool = False, fleer: bool = False, pos: Tuple[int, int] = None):
+	def create_enemy(
+			self, no_ai: bool = False, fleer: bool = False, pos: Tuple[int, int] = None, emitters: List[dict] = None
+	):
 		"""
 		Adds an enemy to the map.
+		:param emitters: The bullet patterns fired by the enemy, by default the ones of all the enemies of the map.
 		"""
 		self.add_entity(
 			Entity(
@@ -64,7 +139,8 @@ class ObjectHandler:
 					uniform(1, self.game.map.map_size[1] - 1)
 				) if pos is None else pos,
 				no_ai = no_ai,
-				fleer = fleer
+				fleer = fleer,
+				emitters = self.game.map.map_data["enemies"].get("emitters") if emitters is None else emitters
 			)
 		)
 		while (
@@ -74,3 +150,4 @@ class ObjectHandler:
 		):
 			self.entities[-1].x = uniform(1, self.game.map.map_size[0] - 1)
 			self.entities[-1].y = uniform(1, self.game.map.map_size[0] - 1)
+		self.entity_grid.move(self.entities[-1])
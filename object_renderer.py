@@ -1,7 +1,14 @@
 import pygame
+import numpy as np
+import math
 import os
+from threading import Lock
 
-from settings import SETTINGS
+from settings import SETTINGS, set_column_width
+from surface_cache import SurfaceCache
+from fog import Fog
+from floor_renderer import FloorRenderer
+from ambient_occlusion import AmbientOcclusion
 
 
 class ObjectRenderer:
@@ -15,15 +22,43 @@ class ObjectRenderer:
 		self.game = game
 		self.screen = self.game.rendering_surface
 		self.wall_textures = self.load_wall_textures()
+
+		# The distance fog, darkening the walls and sprites
+		self.fog = Fog()
+
+		# The wall textures as arrays of pixels for the surfarray wall renderer, built on first use, and the rows, mask
+		# and pixels of the walls it draws, built whenever the rays change
+		self.wall_texture_arrays = None
+		self.surfarray_walls = None
+
+		# Caches the wall columns darkened by the fog, so they are not darkened again every frame
+		self.column_cache = SurfaceCache(SETTINGS.graphics.column_cache_budget_mb * 1024 * 1024)
+		self.game.render_stats.add_cache("columns", self.column_cache)
+
+		# Caches the scaled frames of the sprites, shared by every sprite
+		self.sprite_cache = SurfaceCache(SETTINGS.graphics.sprite_cache_budget_mb * 1024 * 1024)
+		self.game.render_stats.add_cache("sprites", self.sprite_cache)
+
+		# Renders the textured floor and ceiling
+		self.floor_renderer = FloorRenderer(self.game, self.fog)
+
 		IMAGE_RESOLUTION = (SETTINGS.graphics.resolution[0], SETTINGS.graphics.resolution [1] // 2)
 		self.sky_texture = self.get_texture('assets/textures/sky.png', IMAGE_RESOLUTION)
 		self.sky_offset = 0
 
-		# Creates a depth texture, storing the depth of everything on the screen in one texture
-		self.depth_texture = pygame.Surface(SETTINGS.graphics.resolution).convert()
+		# The depth buffer, storing the depth of every pixel on the screen
+		self.depth_buffer = np.zeros(SETTINGS.graphics.resolution, dtype=np.float32)
+
+		# The distance of the floor or ceiling seen by each row of the screen, which the walls closer than it hide
+		rows = np.arange(SETTINGS.graphics.resolution[1]) - SETTINGS.graphics.half_height + 0.5
+		self.row_distances = (0.5 * SETTINGS.graphics.screen_distance / np.abs(rows)).astype(np.float32)
+		# The depth of each row where no wall hides it, the sky being as far as possible
+		self.row_depths = self.row_distances.copy()
+		if not (SETTINGS.graphics.floor_casting and self.floor_renderer.draws_ceiling):
+			self.row_depths[:SETTINGS.graphics.half_height] = SETTINGS.graphics.max_depth
 
-		# Creates a texture for the ambient occlusion
-		self.ambient_occlusion_texture = pygame.Surface(SETTINGS.graphics.resolution).convert()
+		# Darkens the screen based on the depth buffer
+		self.ambient_occlusion = AmbientOcclusion()
 
 
 	def draw(self):
@@ -33,31 +68,50 @@ class ObjectRenderer:
 		# Renders the sky
 		self.draw_background()
 
-		# Renders all the game objects
-		self.render_game_objects()
+		# Renders the walls the backend draws on their own, then all the game objects
+		self.game.render_backend.draw_walls()
+		self.game.render_backend.composite()
+
+		# The surfaces evicted from the caches while rendering this frame can be reused in the next ones
+		self.column_cache.recycle()
+		self.sprite_cache.recycle()
+
+		# Darkens the creases of the scene using the depths of the rendered walls and sprites
+		if SETTINGS.graphics.ambient_occlusion:
+			with self.game.render_stats.timer("depth buffer"):
+				self.fill_depth_buffer()
+			with self.game.render_stats.timer("ambient occlusion"):
+				self.ambient_occlusion.apply(self.screen, self.depth_buffer)
 
 
 	def draw_background(self):
 		"""
-		Draws the sky texture if in 3D.
+		Draws the sky texture and the floor if in 3D.
 		"""
 		if self.game.is_3D:
 			# Gets the offset of the sky texture
 			self.sky_offset = (self.sky_offset + 0.75 * self.game.player.rel) % SETTINGS.graphics.resolution[0]
 
 			# Draws two sky textures, each being slightly offset so it matches the perspective
-			self.screen.blit(self.sky_texture, (-self.sky_offset, 0))
-			self.screen.blit(self.sky_texture, (-self.sky_offset + SETTINGS.graphics.resolution[0], 0))
+			if not (SETTINGS.graphics.floor_casting and self.floor_renderer.draws_ceiling):
+				self.screen.blit(self.sky_texture, (-self.sky_offset, 0))
+				self.screen.blit(self.sky_texture, (-self.sky_offset + SETTINGS.graphics.resolution[0], 0))
+
+			# Draws the textured floor (and ceiling)
+			if SETTINGS.graphics.floor_casting:
+				with self.game.render_stats.timer("floor"):
+					self.floor_renderer.draw(self.screen)
 
 			# Draws the floor color
-			pygame.draw.rect(
-				self.screen,
-				SETTINGS.graphics.floor_color,
-				(
-					0, SETTINGS.graphics.resolution[1] // 2,
-					SETTINGS.graphics.resolution[0], SETTINGS.graphics.resolution[1],
+			else:
+				pygame.draw.rect(
+					self.screen,
+					SETTINGS.graphics.floor_color,
+					(
+						0, SETTINGS.graphics.resolution[1] // 2,
+						SETTINGS.graphics.resolution[0], SETTINGS.graphics.resolution[1],
+					)
 				)
-			)
 
 
 	def render_game_objects(self):
@@ -65,33 +119,305 @@ class ObjectRenderer:
 		Renders all objects in the game.
 		"""
 		# Gets the list of objects to render, and sorts them by the first away to the closest
-		objects_list = sorted(self.game.raycasting.objects_to_render, key=lambda t: t[0], reverse=True)
-
-		# Clears the depth texture
-		# self.depth_texture.fill((0, 0, 0))
-
-		# Normalize function
-		normalize_depth = lambda x: (1 - (x / SETTINGS.graphics.max_depth)) * 255
-
+		objects_list = sorted(
+			self.game.raycasting.walls_to_render + self.game.raycasting.objects_to_render
+			+ self.game.raycasting.projectiles_to_render,
+			key=lambda t: t[0], reverse=True
+		)
 
 		# Fetches all objects in the raycast results and renders them
 		for depth, image, pos in objects_list:
 			# Draws the wall fragment to the wall
 			self.screen.blit(image, pos)
 
-			# Drawing to the depth texture
-			"""normalized_depth = normalize_depth(depth)
-			try:
-				pygame.draw.rect(
-					self.depth_texture,
-					(normalized_depth, normalized_depth, normalized_depth),
-					pygame.Rect(
-						pos[0], pos[1],
-						image.get_width(), image.get_height()
-					)
+
+	def render_game_objects_zbuffer(self):
+		"""
+		Renders all the walls, then the sprites from the furthest to the closest, only in the columns where they are in
+		front of the walls, using the depth of each ray as depth buffer. Everything is drawn in a single call (the
+		surfarray wall renderer already drew the walls).
+		"""
+		blits = [(image, pos) for depth, image, pos in self.game.raycasting.walls_to_render]
+
+		# Only sorts the sprites, as the walls never overlap each other
+		objects = sorted(
+			self.game.raycasting.objects_to_render + self.game.raycasting.projectiles_to_render,
+			key=lambda t: t[0], reverse=True
+		)
+		if objects:
+			blits.extend(self.clip_behind_walls(objects))
+		self.screen.fblits(blits)
+
+
+	def clip_behind_walls(self, objects: list) -> list:
+		"""
+		Clips the given images to the columns where they are closer to the camera than the walls. Whether each image is
+		wholly in front of the walls, wholly behind them or in between is found for all of them at once, and only the
+		images in between are split into their runs of visible columns.
+		:param objects: The depth, image and position of each image.
+		:return: The images, or the subsurfaces of their visible parts, to draw in the same order, with their position.
+		"""
+		depths = self.game.raycasting.depths
+		scale = SETTINGS.graphics.scale
+		image_depths = np.array([depth for depth, image, pos in objects])
+		left = np.array([int(pos[0]) for depth, image, pos in objects])
+		right = left + np.array([image.get_width() for depth, image, pos in objects])
+
+		# The rays covered by each image
+		first_ray = np.clip(left // scale, 0, len(depths))
+		last_ray = np.clip(-(-right // scale), first_ray, len(depths))
+
+		# The closest and furthest wall behind each image, reduced over the ranges of rays all at once. The walls are
+		# padded so the ranges can end at the last ray, and the images covering no ray are behind
+		bounds = np.stack((first_ray, last_ray), axis=1).ravel()
+		covered = first_ray < last_ray
+		closest = np.minimum.reduceat(np.append(depths, 0), bounds)[::2]
+		furthest = np.maximum.reduceat(np.append(depths, 0), bounds)[::2]
+		in_front = (covered & (closest > image_depths)).tolist()
+		behind = (~covered | (furthest <= image_depths)).tolist()
+
+		blits = []
+		for i, (depth, image, pos) in enumerate(objects):
+			if in_front[i]:
+				blits.append((image, (int(pos[0]), int(pos[1]))))
+				continue
+			if behind[i]:
+				continue
+
+			# Draws each run of visible columns separately
+			visible = depths[first_ray[i]:last_ray[i]] > depth
+			edges = np.flatnonzero(np.diff(np.concatenate(([False], visible, [False])).astype(np.int8)))
+			image_left, top = int(pos[0]), int(pos[1])
+			for start, end in zip(edges[::2], edges[1::2]):
+				run_left = max((first_ray[i] + start) * scale, image_left)
+				run_right = min((first_ray[i] + end) * scale, image_left + image.get_width())
+				area = pygame.Rect(run_left - image_left, 0, run_right - run_left, image.get_height())
+				blits.append((image.subsurface(area), (run_left, top)))
+			self.sprite_cache.count_allocation(len(edges) // 2)
+		return blits
+
+
+	def fill_depth_buffer(self):
+		"""
+		Fills the depth buffer with the depth of the walls hit by the rays, the floor and ceiling around them, and the
+		visible pixels of the sprites in front of them. The projectiles are left out, as they glow rather than occlude,
+		and there can be hundreds of them.
+		"""
+		depths = self.game.raycasting.depths
+		if len(depths) == 0:
+			return None
+
+		# Each pixel sees the wall of its column if it is closer than the floor or ceiling, otherwise what is behind it
+		column_depths = depths.astype(np.float32)[np.minimum(
+			np.arange(SETTINGS.graphics.resolution[0]) // SETTINGS.graphics.scale, len(depths) - 1
+		), None]
+		self.depth_buffer[:] = self.row_depths
+		np.copyto(self.depth_buffer, column_depths, where=self.row_distances > column_depths)
+
+		# Draws the opaque pixels of each sprite where it is closer than what is behind it, finding the opaque pixels of
+		# each image once even if many sprites share it
+		screen_rect = self.screen.get_rect()
+		opaque_masks = {}
+		for depth, image, pos in self.game.raycasting.objects_to_render:
+			rect = image.get_rect(topleft=(int(pos[0]), int(pos[1]))).clip(screen_rect)
+			if rect.width == 0 or rect.height == 0:
+				continue
+			if image not in opaque_masks:
+				opaque_masks[image] = pygame.surfarray.pixels_alpha(image) > 0
+			opaque = opaque_masks[image][
+				rect.x - int(pos[0]):rect.right - int(pos[0]), rect.y - int(pos[1]):rect.bottom - int(pos[1])
+			]
+			buffer = self.depth_buffer[rect.left:rect.right, rect.top:rect.bottom]
+			np.copyto(buffer, np.minimum(buffer, depth), where=opaque)
+
+
+	def build_wall_texture_arrays(self):
+		"""
+		Builds the pixel arrays of every mip level of the wall textures used by the surfarray wall renderer, one set per
+		fog band. The levels are flattened one after the other, the pixel (u, v) of a level being at the index of its
+		first pixel + u * level size + v, and the index of the first pixel of each level is kept by band, texture and
+		level.
+		"""
+		# Index 0 is not a texture, so the textures can be indexed by their number on the map
+		self.wall_texture_starts = np.zeros(
+			(self.fog.bands, len(self.wall_mipmaps) + 1, len(self.wall_mipmaps[1])), dtype=np.int32
+		)
+		arrays, size = [], 0
+		for band in range(self.fog.bands):
+			for i, mipmaps in self.wall_mipmaps.items():
+				for level, texture in enumerate(mipmaps):
+					pixels = pygame.surfarray.array2d(self.fog.apply(texture.convert(self.screen), band)).astype(np.uint32)
+					self.wall_texture_starts[band, i, level] = size
+					arrays.append(pixels.ravel())
+					size += pixels.size
+		self.wall_texture_arrays = np.concatenate(arrays)
+
+
+	@staticmethod
+	def scaled_coordinates(positions: np.ndarray, source_size: np.ndarray, size: np.ndarray) -> np.ndarray:
+		"""
+		Returns the coordinates in the source of the given positions in a scaled surface, sampled like
+		pygame.transform.scale does : in 16.16 fixed point, starting half a step in.
+		:param positions: The positions in the scaled surface.
+		:param source_size: The size of the source along the same axis.
+		:param size: The size of the scaled surface along the same axis.
+		"""
+		step = (source_size << 16) // np.maximum(size, 1)
+		return (positions * step + step // 2) >> 16
+
+
+	def build_walls_surfarray(self):
+		"""
+		Builds the pixels of every wall column at once, by indexing the wall texture arrays, for the surfarray wall
+		renderer to draw them until the rays change. Each column is sampled from the same mip level and at the same
+		height as the one the raycasting scales, so the pixels are the same as the reference ones.
+		"""
+		self.surfarray_walls = None
+		if self.wall_texture_arrays is None:
+			self.build_wall_texture_arrays()
+		ray_arrays = self.game.raycasting.ray_arrays
+		if len(ray_arrays) == 0:
+			return None
+
+		texture_size = SETTINGS.graphics.texture_size
+		scale = SETTINGS.graphics.scale
+		screen_height = SETTINGS.graphics.resolution[1]
+		depth, projection_height, texture, offset = ray_arrays.T
+
+		# The texture column, height and fog band of each ray, quantized like the raycasting does
+		texture = texture.astype(np.int32)
+		column = (offset * (texture_size - scale)).astype(np.int32)
+		height = projection_height.astype(np.int32) // SETTINGS.graphics.column_cache_height_step \
+			* SETTINGS.graphics.column_cache_height_step
+		bands = self.fog.bands_of(depth, self.game.raycasting.ray_lights)
+		tall = height >= screen_height
+
+		# The mip level of each column like mipmap_level picks it, the walls taller than the screen using the texture
+		level = np.zeros(height.shape, dtype=np.int32)
+		if SETTINGS.graphics.wall_mipmaps:
+			level = np.clip(np.frexp(texture_size // np.maximum(height, 1))[1] - 1, 0, len(self.wall_mipmaps[1]) - 1)
+			level[tall] = 0
+		level_size = texture_size >> level
+		column_width = np.maximum(scale * level_size // texture_size, 1)
+		first_u = np.minimum(column >> level, level_size - column_width)
+
+		# The part of the level each column is scaled from, and where it lands on the screen. The walls taller than the
+		# screen only show the middle of the texture
+		source_top, source_height = np.zeros(height.shape, dtype=np.int32), level_size.copy()
+		top = SETTINGS.graphics.half_height - height // 2
+		if tall.any():
+			texture_height = texture_size * screen_height / height[tall]
+			source_top[tall] = SETTINGS.graphics.half_texture_size - texture_height // 2
+			source_height[tall] = texture_height
+			top[tall] = 0
+		height = np.where(tall, screen_height, height)
+
+		# Only works on the rows where at least one wall is visible
+		first_row = max(int(top.min()), 0)
+		last_row = min(int((top + height).max()), screen_height)
+		if first_row >= last_row:
+			return None
+
+		# The vertical texture coordinate of each row of each ray, the rows outside of the walls clamped to their edges
+		rows = np.arange(first_row, last_row, dtype=np.int32)[:, None] - top
+		is_wall = (rows >= 0) & (rows < height)
+		v = self.scaled_coordinates(np.clip(rows, 0, np.maximum(height - 1, 0)), source_height, height)
+
+		# The index of the top of the texture column drawn in each column of pixels
+		u = first_u[:, None] + self.scaled_coordinates(np.arange(scale, dtype=np.int32), column_width[:, None], scale)
+		columns = ((self.wall_texture_starts[bands, texture, level] + source_top)[:, None] + u * level_size[:, None])
+
+		# The rows are contiguous in the rendering surface, so the rays are repeated into columns of pixels before indexing
+		self.surfarray_walls = (
+			slice(first_row, last_row),
+			np.repeat(is_wall, scale, axis=1),
+			self.wall_texture_arrays.take(np.repeat(v, scale, axis=1) + columns.ravel())
+		)
+
+
+	def render_walls_surfarray(self):
+		"""
+		Draws the wall pixels built by build_walls_surfarray straight into the rendering surface, keeping the background
+		around them.
+		"""
+		if self.surfarray_walls is None:
+			return None
+		rows, is_wall, walls = self.surfarray_walls
+		pixels = pygame.surfarray.pixels2d(self.screen).T
+		np.putmask(pixels[rows, :walls.shape[1]], is_wall, walls)
+		del pixels
+
+
+	def render_walls_spans(self):
+		"""
+		Renders the wall columns in spans : the consecutive rays hitting the same face of a wall at the same height and
+		fog band are scaled from the texture in a single call, straight into the rendering surface.
+		"""
+		ray_arrays = self.game.raycasting.ray_arrays
+		if len(ray_arrays) == 0:
+			return None
+
+		texture_size = SETTINGS.graphics.texture_size
+		scale = SETTINGS.graphics.scale
+		depth, projection_height, texture, offset = ray_arrays.T
+
+		# The texture column, height and fog band of each ray, quantized like the raycasting does
+		texture = texture.astype(np.int32)
+		columns = (offset * (texture_size - scale)).astype(np.int32)
+		heights = projection_height.astype(np.int32) // SETTINGS.graphics.column_cache_height_step \
+			* SETTINGS.graphics.column_cache_height_step
+		bands = self.fog.bands_of(depth, self.game.raycasting.ray_lights)
+
+		# Groups the heights into levels where rendering any of them at the same height moves the visible pixels by less
+		# than the tolerance : the edges of the walls move by half the height change, and the rows of the walls taller
+		# than the screen by the relative height change times half the screen
+		if SETTINGS.graphics.wall_span_tolerance > 0:
+			screen_height = SETTINGS.graphics.resolution[1]
+			edges = np.where(
+				heights < screen_height,
+				heights / 2,
+				screen_height / 2 * (1 + np.log(np.maximum(heights, screen_height) / screen_height))
+			)
+			levels = (edges // SETTINGS.graphics.wall_span_tolerance).astype(np.int32)
+		else:
+			levels = heights
+
+		# A span ends wherever the texture, height level or fog band changes, or the texture stops advancing steadily,
+		# which happens at the edges of the faces and tiles
+		steps = np.diff(columns)
+		breaks = (np.diff(texture) != 0) | (np.diff(levels) != 0) | (np.diff(bands) != 0) | (steps < 0)
+		breaks[1:] |= np.abs(np.diff(steps)) > 1
+		starts = np.concatenate(([0], np.flatnonzero(breaks) + 1))
+		ends = np.concatenate((starts[1:], [len(ray_arrays)]))
+		self.game.render_stats.count("wall spans", len(starts))
+
+		for start, end in zip(starts.tolist(), ends.tolist()):
+			height = int(heights[(start + end) // 2])
+			if height <= 0:
+				continue
+
+			# The part of the texture covered by the span, from the mip level matching its height
+			level = self.mipmap_level(height)
+			source = self.wall_mipmaps[int(texture[start])][level]
+			column_width = max(scale * source.get_width() // texture_size, 1)
+			left = min(int(columns[start]) >> level, source.get_width() - column_width)
+			right = min((int(columns[end - 1]) >> level) + column_width, source.get_width())
+
+			if height < SETTINGS.graphics.resolution[1]:  # Normal execution if we're not too close to the wall
+				area = pygame.Rect(left, 0, right - left, source.get_height())
+				span = pygame.Rect(start * scale, SETTINGS.graphics.half_height - height // 2, (end - start) * scale, height)
+			else:  # If the size of the wall exceeds the window's height
+				texture_height = texture_size * SETTINGS.graphics.resolution[1] / height
+				area = pygame.Rect(
+					left, SETTINGS.graphics.half_texture_size - texture_height // 2, right - left, texture_height
 				)
-			except ValueError: pass"""
+				span = pygame.Rect(start * scale, 0, (end - start) * scale, SETTINGS.graphics.resolution[1])
 
+			# Scales the span into the rendering surface itself, then darkens it there
+			destination = self.screen.subsurface(span)
+			pygame.transform.scale(source.subsurface(area), span.size, destination)
+			self.fog.apply(destination, int(bands[start]))
+			self.column_cache.count_allocation(2)
 
 
 	@staticmethod
@@ -108,9 +434,86 @@ class ObjectRenderer:
 
 	def load_wall_textures(self):
 		"""
-		Loads all the wall textures.
+		Loads all the wall textures, and pre-slices each of them into a table of wall columns.
 		"""
-		return {
-			i: self.get_texture(f"assets/textures/walls/{i}.png")
+		# Converted without their alpha channel, so the wall columns scaled from them are blitted as opaque surfaces
+		wall_textures = {
+			i: self.get_texture(f"assets/textures/walls/{i}.png").convert()
 			for i in range(1, len(os.listdir(os.path.join(os.path.dirname(__file__), "assets/textures/walls/"))) + 1)
 		}
+
+		# Builds the mip pyramid of each texture, so distant walls are scaled from smaller sources
+		self.wall_mipmaps = {
+			i: self.get_mipmaps(texture)
+			for i, texture in wall_textures.items()
+		}
+
+		# Slices every possible column of each texture once, so the raycasting only has to index them
+		self.wall_columns = {}
+		self.build_wall_columns()
+		# Held while the wall columns are rendered, so they are never rebuilt while the strips of a frame read them
+		self.wall_columns_lock = Lock()
+		return wall_textures
+
+
+	def build_wall_columns(self):
+		"""
+		(Re)builds the table of columns of each mip level of each wall texture, for the current column width.
+		"""
+		# Updated in place, as the raycasting keeps a pointer towards it
+		self.wall_columns.update({
+			i: [self.get_texture_columns(level) for level in mipmaps]
+			for i, mipmaps in self.wall_mipmaps.items()
+		})
+
+
+	@staticmethod
+	def get_mipmaps(texture: pygame.Surface, min_size: int = 4) -> list:
+		"""
+		Builds the mip pyramid of the given texture, each level being half the size of the previous one.
+		:param texture: The full size texture.
+		:param min_size: The size of the smallest level, default is 4.
+		:return: The list of levels, starting with the texture itself.
+		"""
+		mipmaps = [texture]
+		while mipmaps[-1].get_width() // 2 >= min_size:
+			mipmaps.append(pygame.transform.smoothscale_by(mipmaps[-1], 0.5))
+		return mipmaps
+
+
+	def mipmap_level(self, projection_height: float) -> int:
+		"""
+		Returns the mip level from which a wall column of the given height should be scaled.
+		:param projection_height: The height of the wall column on the screen.
+		"""
+		if not SETTINGS.graphics.wall_mipmaps:
+			return 0
+		# The biggest level still at least as tall as the column
+		level = (SETTINGS.graphics.texture_size // max(int(projection_height), 1)).bit_length() - 1
+		return max(min(level, len(self.wall_mipmaps[1]) - 1), 0)
+
+
+	def set_column_width(self, width: int):
+		"""
+		Changes the width of the column rendered by each ray, along with everything depending on it.
+		:param width: The new width of the columns, in pixels.
+		"""
+		with self.wall_columns_lock:
+			set_column_width(width)
+			self.build_wall_columns()
+			self.column_cache.clear()
+
+
+	@staticmethod
+	def get_texture_columns(texture: pygame.Surface) -> list:
+		"""
+		Slices the given wall texture (or mip level) into every column a ray can render.
+		:param texture: The wall texture.
+		:return: A list of column subsurfaces, indexed by their horizontal position in the texture.
+		"""
+		# The columns get narrower along with the mip level
+		column_width = max(SETTINGS.graphics.scale * texture.get_width() // SETTINGS.graphics.texture_size, 1)
+		return [
+			texture.subsurface(x, 0, column_width, texture.get_height())
+			for x in range(texture.get_width() - column_width + 1)
+		]
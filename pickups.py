@@ -19,16 +19,21 @@ class Pickup(SpriteObject):
 		self.pickup_distance = pickup_distance
 		self._creation_time = time.time()
 
-	def update(self):
+	def in_reach(self) -> bool:
 		"""
-		Calls the sprite update method along with the pickup behaviour.
+		Returns whether the player is close enough to pick up the pickup.
 		"""
-		super().update()
-		if (round(self.player.x, 1) - self.pickup_distance < self.x < round(self.player.x, 1) + self.pickup_distance) and \
-				(round(self.player.y, 1) - self.pickup_distance < self.y < round(self.player.y, 1) + self.pickup_distance):
-			if self.picked_up is False:
-				self.pick_up()
-				self.game.objects_handler.sprites_list.remove(self)
+		return (round(self.player.x, 1) - self.pickup_distance < self.x < round(self.player.x, 1) + self.pickup_distance) \
+			and (round(self.player.y, 1) - self.pickup_distance < self.y < round(self.player.y, 1) + self.pickup_distance)
+
+
+	def try_pick_up(self):
+		"""
+		Picks up the pickup if the player is close enough. Only called for the pickups around the player.
+		"""
+		if self.in_reach() and self.picked_up is False:
+			self.pick_up()
+			self.game.objects_handler.remove_sprite(self)
 
 
 	def pick_up(self):
@@ -55,15 +60,21 @@ class PickupAnimated(AnimatedSprite):
 		self._creation_time = time.time()
 
 
-	def update(self):
-		super().update()
-		if (round(self.player.x, 1) - self.pickup_distance < self.x < round(self.player.x, 1) + self.pickup_distance) and \
-				(round(self.player.y, 1) - self.pickup_distance < self.y < round(self.player.y, 1) + self.pickup_distance):
-			if self.picked_up is False:
-				self.pick_up()
-				try:
-					self.game.objects_handler.sprites_list.remove(self)
-				except ValueError: pass
+	def in_reach(self) -> bool:
+		"""
+		Returns whether the player is close enough to pick up the pickup.
+		"""
+		return (round(self.player.x, 1) - self.pickup_distance < self.x < round(self.player.x, 1) + self.pickup_distance) \
+			and (round(self.player.y, 1) - self.pickup_distance < self.y < round(self.player.y, 1) + self.pickup_distance)
+
+
+	def try_pick_up(self):
+		"""
+		Picks up the pickup if the player is close enough. Only called for the pickups around the player.
+		"""
+		if self.in_reach() and self.picked_up is False:
+			self.pick_up()
+			self.game.objects_handler.remove_sprite(self)
 
 	def pick_up(self):
 		pass
@@ -102,18 +113,20 @@ class Ammo(Pickup):
 		# Destroys the entity
 		if self.time_to_disappear is not None and \
 				time.time() - self._creation_time > self.time_to_disappear:
-			self.game.objects_handler.sprites_list.remove(self)
-			return None
+			self.game.objects_handler.remove_sprite(self)
+
 
-		# Picks up ammo
-		if (round(self.player.x, 1) - self.pickup_distance < self.x < round(self.player.x, 1) + self.pickup_distance) and \
-				(round(self.player.y, 1) - self.pickup_distance < self.y < round(self.player.y, 1) + self.pickup_distance):
+	def try_pick_up(self):
+		"""
+		Picks up the ammo if the player is close enough and its weapon is not full.
+		"""
+		if self.in_reach():
 			# Gets the currently used weapon
 			ammo_weapon = self.game.get_weapon_by_name(self.ammo_type)
 			# If the ammo capacity for this gun is not full, we pickup the ammo
 			if self.picked_up is False and ammo_weapon.ammo < ammo_weapon.max_ammo:
 				self.pick_up()
-				self.game.objects_handler.sprites_list.remove(self)
+				self.game.objects_handler.remove_sprite(self)
 
 
 	def pick_up(self):
@@ -152,16 +165,18 @@ class Health(Pickup):
 		# Destroys the entity
 		if self.time_to_disappear is not None and \
 				time.time() - self._creation_time > self.time_to_disappear:
-			self.game.objects_handler.sprites_list.remove(self)
-			return None
+			self.game.objects_handler.remove_sprite(self)
+
 
-		# Picks up the health
-		if (round(self.player.x, 1) - self.pickup_distance < self.x < round(self.player.x, 1) + self.pickup_distance) and \
-				(round(self.player.y, 1) - self.pickup_distance < self.y < round(self.player.y, 1) + self.pickup_distance):
+	def try_pick_up(self):
+		"""
+		Picks up the health if the player is close enough and not at full health.
+		"""
+		if self.in_reach():
 			# If the ammo capacity for this gun is not full, we pickup the ammo
 			if self.picked_up is False and self.game.player.health < SETTINGS.player.base_health:
 				self.pick_up()
-				self.game.objects_handler.sprites_list.remove(self)
+				self.game.objects_handler.remove_sprite(self)
 
 
 	def pick_up(self):
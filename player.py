@@ -137,7 +137,7 @@ class Player:
 		Draws the player on the map.
 		"""
 		if self.game.is_3D is False:
-			pygame.draw.line(
+			self.game.dirty_rects.append(pygame.draw.line(
 				self.game.screen,
 				'yellow',
 				(self.x * self.game.map.tile_size, self.y * self.game.map.tile_size),
@@ -146,13 +146,13 @@ class Player:
 					self.y * self.game.map.tile_size + 50 * math.sin(self.angle)
 				),
 				2
-			)
-			pygame.draw.circle(
+			))
+			self.game.dirty_rects.append(pygame.draw.circle(
 				self.game.screen,
 				'green',
 				(self.x * self.game.map.tile_size, self.y * self.game.map.tile_size),
 				15
-			)
+			))
 
 
 	def mouse_control(self):
@@ -0,0 +1,370 @@
+import pygame
+import numpy as np
+import math
+import os
+import time
+
+from settings import SETTINGS
+from sprite_object import VFX, load_image, _2D_images
+
+
+# The look and behaviour of each type of projectile, indexed by the type stored in the pool
+PROJECTILE_TYPES = [
+	{
+		"name": "fireball",
+		"path": "assets/animated_sprites/fireball",
+		"scale": 0.25,
+		"shift": 0.5,
+		"animation_time": 120,
+		"light": (6, 2)
+	},
+	{
+		"name": "fireball_blue",
+		"path": "assets/animated_sprites/fireball_blue",
+		"scale": 0.25,
+		"shift": 0.5,
+		"animation_time": 120,
+		"light": (6, 2)
+	}
+]
+
+
+class ProjectilePool:
+	"""
+	Every projectile of the level, stored as a structure of NumPy arrays instead of one sprite per projectile.
+	The movement, wall collisions, player hits, culling and projection of all the projectiles are computed at once each
+	frame, so thousands of them can be alive at the same time.
+	"""
+	# How close to the camera a projectile can get before being culled, lower than the sprites so the player can still
+	# see the projectiles about to hit them
+	culling_distance = 0.1
+	# How many sizes a projectile can have each time its size doubles on the screen
+	sizes_per_octave = 8
+
+	# The names of the arrays storing the projectiles, all indexed the same way
+	FIELDS = ("x", "y", "dx", "dy", "noclip", "age", "kind", "ids", "light_x", "light_y")
+
+	def __init__(self, game, capacity: int = 256):
+		"""
+		:param game: The instance of the Game.
+		:param capacity: The amount of projectiles the arrays can hold before growing, default is 256.
+		"""
+		self.game = game
+
+		# The amount of alive projectiles, stored at the start of the arrays
+		self.count = 0
+		# The identifier given to the next projectile, keying its light
+		self._next_id = 0
+
+		# The state of each projectile
+		self.x = np.zeros(capacity)
+		self.y = np.zeros(capacity)
+		self.dx = np.zeros(capacity)  # The distance travelled per millisecond along each axis
+		self.dy = np.zeros(capacity)
+		self.noclip = np.zeros(capacity, dtype=bool)  # Whether the projectile goes through walls
+		self.age = np.zeros(capacity, dtype=np.float32)  # In milliseconds
+		self.kind = np.zeros(capacity, dtype=np.int8)  # The index of the type of the projectile
+		self.ids = np.zeros(capacity, dtype=np.int64)
+		# The tile lit by each projectile, (-1, -1) if it does not light any
+		self.light_x = np.full(capacity, -1, dtype=np.int32)
+		self.light_y = np.full(capacity, -1, dtype=np.int32)
+
+		# The animation frames of each type of projectile
+		self.animations = [
+			[load_image(os.path.join(kind["path"], filename)) for filename in sorted(os.listdir(kind["path"]))]
+			for kind in PROJECTILE_TYPES
+		]
+
+		# Loads the player injured sound
+		self.game.sound.load_sound("player_injured", self.game.sound.sounds_path + "player_injured.wav", "entity")
+
+
+	def __len__(self) -> int:
+		return self.count
+
+
+	def spawn(self, x, y, dx, dy, noclip=False, kind=None):
+		"""
+		Adds one or many projectiles at once. Every parameter can be a single value or an array of the same length.
+		:param x: The x coordinate of the projectiles.
+		:param y: The y coordinate of the projectiles.
+		:param dx: The distance travelled by the projectiles per millisecond along the x axis.
+		:param dy: The distance travelled by the projectiles per millisecond along the y axis.
+		:param noclip: Whether the projectiles go through walls. False by default.
+		:param kind: The index of the type of the projectiles, by default the blue fireball if they go through walls and
+		the fireball otherwise.
+		"""
+		if kind is None:
+			kind = np.where(noclip, 1, 0)
+		x, y, dx, dy, noclip, kind = np.broadcast_arrays(x, y, dx, dy, noclip, kind)
+		amount = x.size
+		if amount == 0:
+			return None
+
+		# Grows the arrays if needed, doubling their size to keep spawning cheap
+		if self.count + amount > len(self.x):
+			capacity = max(2 * len(self.x), self.count + amount)
+			for name in self.FIELDS:
+				field = getattr(self, name)
+				grown = np.zeros(capacity, dtype=field.dtype)
+				grown[:self.count] = field[:self.count]
+				setattr(self, name, grown)
+
+		new = slice(self.count, self.count + amount)
+		self.x[new], self.y[new], self.dx[new], self.dy[new] = x.ravel(), y.ravel(), dx.ravel(), dy.ravel()
+		self.noclip[new], self.kind[new] = noclip.ravel(), kind.ravel()
+		self.age[new] = 0
+		self.ids[new] = np.arange(self._next_id, self._next_id + amount)
+		self.light_x[new], self.light_y[new] = -1, -1
+		self._next_id += amount
+		self.count += amount
+
+
+	def is_free(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+		"""
+		Returns whether each of the given positions is outside of the walls.
+		:param x: The x coordinates of the positions.
+		:param y: The y coordinates of the positions.
+		"""
+		grid = self.game.map.grid
+		# Truncates the coordinates the same way int() does
+		tiles_x, tiles_y = x.astype(np.int32), y.astype(np.int32)
+		inside = (tiles_x >= 0) & (tiles_x < grid.shape[0]) & (tiles_y >= 0) & (tiles_y < grid.shape[1])
+		free = np.ones(x.shape, dtype=bool)
+		free[inside] = grid[tiles_x[inside], tiles_y[inside]] == 0
+		return free
+
+
+	def update(self):
+		"""
+		Called every frame : projects, moves and collides every projectile, and removes the destroyed ones.
+		"""
+		if self.count == 0:
+			return None
+		alive = slice(0, self.count)
+		x, y, dx, dy, noclip = self.x[alive], self.y[alive], self.dx[alive], self.dy[alive], self.noclip[alive]
+		scales = np.array([kind["scale"] for kind in PROJECTILE_TYPES])[self.kind[alive]]
+		self.age[alive] += self.game.delta_time
+
+		# Places the projectiles on the screen before they move, like the sprites
+		if self.game.is_3D:
+			screen_x, half_widths, norm_dists = self.get_sprites()
+		else:
+			self.render_2D_sprites()
+
+		# Moves the projectiles along each axis, unless a wall is in the way
+		step_x, step_y = dx * self.game.delta_time, dy * self.game.delta_time
+		moves_x = noclip | self.is_free(x + dx * scales, y)
+		x += np.where(moves_x, step_x, 0)
+		moves_y = noclip | self.is_free(x, y + dy * scales)
+		y += np.where(moves_y, step_y, 0)
+		# Destroys the projectiles stuck against a wall
+		destroyed = ~(moves_x | moves_y)
+
+		# Hurts the player once per projectile touching them
+		hits = (x - self.game.player.x) ** 2 + (y - self.game.player.y) ** 2 < (SETTINGS.player.player_size_scale / 100) ** 2
+		if hits.any():
+			self.game.player.health -= int(np.count_nonzero(hits))
+			self.game.player.check_health()
+			self.game.sound.loaded_sounds["player_injured"].play()
+		destroyed |= hits
+
+		# Destroys the projectiles out of bounds
+		destroyed |= (x < 0) | (x > self.game.map.map_size[0]) | (y < 0) | (y > self.game.map.map_size[1])
+
+		# If the player shot the projectiles in front of the crosshair, they explode
+		# The projectiles spawned since the lines of sight were computed are still in the hands of their shooter
+		if self.game.player.shot and self.game.is_3D:
+			in_sight = np.zeros(self.count, dtype=bool)
+			computed = self.game.objects_handler.line_of_sight.projectiles[:self.count]
+			in_sight[:len(computed)] = computed
+			shot = (
+				(np.abs(screen_x - SETTINGS.graphics.resolution[0] // 2) < half_widths)
+				& (norm_dists > self.culling_distance) & in_sight & ~destroyed
+			)
+			for i in np.flatnonzero(shot).tolist():
+				self.explode(float(x[i]), float(y[i]))
+			destroyed |= shot
+
+		self.update_lights(destroyed)
+		self.remove(destroyed)
+
+
+	def remove(self, destroyed: np.ndarray):
+		"""
+		Removes the given projectiles, moving the remaining ones to the start of the arrays.
+		:param destroyed: Whether each alive projectile is destroyed.
+		"""
+		if not destroyed.any():
+			return None
+		kept = ~destroyed
+		remaining = int(np.count_nonzero(kept))
+		for name in self.FIELDS:
+			field = getattr(self, name)
+			field[:remaining] = field[:self.count][kept]
+		self.count = remaining
+
+
+	def update_lights(self, destroyed: np.ndarray):
+		"""
+		Moves the light of the projectiles which changed tile, and removes the light of the destroyed ones.
+		:param destroyed: Whether each alive projectile is destroyed.
+		"""
+		if not SETTINGS.graphics.dynamic_lighting:
+			return None
+		alive = slice(0, self.count)
+		tiles_x, tiles_y = self.x[alive].astype(np.int32), self.y[alive].astype(np.int32)
+		lit = np.array([kind["light"] is not None for kind in PROJECTILE_TYPES])[self.kind[alive]]
+
+		# Only the projectiles which left their tile touch the light map
+		for i in np.flatnonzero(destroyed & (self.light_x[alive] >= 0)).tolist():
+			self.game.light_map.remove_light((self, int(self.ids[i])))
+		moved = lit & ~destroyed & ((tiles_x != self.light_x[alive]) | (tiles_y != self.light_y[alive]))
+		for i in np.flatnonzero(moved).tolist():
+			self.game.light_map.set_light(
+				(self, int(self.ids[i])), (int(tiles_x[i]), int(tiles_y[i])), *PROJECTILE_TYPES[self.kind[i]]["light"]
+			)
+		self.light_x[alive] = np.where(moved, tiles_x, self.light_x[alive])
+		self.light_y[alive] = np.where(moved, tiles_y, self.light_y[alive])
+
+
+	def explode(self, x: float, y: float):
+		"""
+		Makes a projectile explode at the given position, damaging the entities around it.
+		:param x: The x coordinate of the explosion.
+		:param y: The y coordinate of the explosion.
+		"""
+		# Adds a VFX object
+		self.game.objects_handler.add_sprite(
+			VFX(
+				self.game,
+				path="assets/animated_sprites/vfx/fireball_exploding/1.png",
+				pos=(x, y),
+				animation_time=15
+			)
+		)
+
+		# Damages the entities based on the distance
+		for entity in self.game.objects_handler.entity_grid.query_radius(x, y, 3):
+			entity_distance = math.hypot(x - entity.x, y - entity.y)
+			if entity_distance < 3 and entity.alive:
+				entity.health -= 100 / entity_distance
+				entity.in_pain = True
+
+
+	def is_visible(self, screen_x: np.ndarray, half_widths: np.ndarray, norm_dists: np.ndarray) -> np.ndarray:
+		"""
+		Returns whether each projectile is in front of the wall rendered in any of the columns it covers on the screen.
+		:param screen_x: The horizontal position of the projectiles on the screen.
+		:param half_widths: Half the width of the projectiles on the screen.
+		:param norm_dists: The depth of the projectiles.
+		"""
+		depths = self.game.raycasting.depths
+		if len(depths) == 0:
+			return np.zeros(screen_x.shape, dtype=bool)
+
+		# The rays covered by each projectile, at least the one at its center
+		first_ray = np.clip((screen_x - half_widths) // SETTINGS.graphics.scale, 0, len(depths) - 1).astype(np.int32)
+		last_ray = np.clip((screen_x + half_widths) // SETTINGS.graphics.scale + 1, first_ray + 1, len(depths))
+
+		# The furthest wall behind each projectile, reduced over the ranges of rays all at once. The walls are padded so
+		# the ranges can end at the last ray
+		bounds = np.stack((first_ray, last_ray.astype(np.int32)), axis=1).ravel()
+		return np.maximum.reduceat(np.append(depths, 0), bounds)[::2] > norm_dists
+
+
+	def get_sprites(self) -> tuple:
+		"""
+		Projects every projectile onto the screen at once, and adds the visible ones to the projectiles to render.
+		:return: The horizontal position on the screen, half width and depth of each projectile.
+		"""
+		alive = slice(0, self.count)
+		player = self.game.player
+		kinds = self.kind[alive]
+
+		# Calculating the angle in which the player will face the projectiles, like the sprites
+		direction_x, direction_y = self.x[alive] - player.x, self.y[alive] - player.y
+		delta = np.arctan2(direction_y, direction_x) - player.angle
+		delta += math.tau * (((direction_x > 0) & (player.angle > math.pi)) | ((direction_x < 0) & (direction_y < 0)))
+		screen_x = (SETTINGS.graphics.half_num_rays + delta / SETTINGS.graphics.delta_angle) * SETTINGS.graphics.scale
+		norm_dists = np.hypot(direction_x, direction_y) * np.cos(delta)
+
+		# The size of each projectile, quantized so its frames can be found in the cache
+		# Bounded by the height of the screen, so the projectiles about to hit the player do not fill the cache, and
+		# rounded to a few sizes per octave rather than a fixed step, as there can be thousands of them at any distance
+		scales = np.array([kind["scale"] for kind in PROJECTILE_TYPES])[kinds]
+		with np.errstate(divide="ignore", over="ignore", invalid="ignore"):
+			projections = np.minimum(SETTINGS.graphics.screen_distance / norm_dists * scales, SETTINGS.graphics.resolution[1])
+			projections = np.maximum(np.nan_to_num(projections), 1)
+			levels = np.round(np.log2(projections) * self.sizes_per_octave) / self.sizes_per_octave
+			heights = np.exp2(levels).astype(np.int64)
+		frames = [animation[0] for animation in self.animations]
+		ratios = np.array([frame.get_width() / frame.get_height() for frame in frames])[kinds]
+		half_widths = (heights * ratios) // 2
+
+		# Only keeps the projectiles in the visible spectrum, in front of the walls
+		image_half_widths = np.array([frame.get_width() // 2 for frame in frames])[kinds]
+		in_view = (
+			(-image_half_widths < screen_x) & (screen_x < SETTINGS.graphics.resolution[0] + image_half_widths)
+			& (norm_dists > self.culling_distance)
+		)
+		visible = in_view & self.is_visible(screen_x, half_widths, norm_dists)
+		self.game.render_stats.count("projectiles drawn", int(np.count_nonzero(visible)))
+		self.game.render_stats.count("projectiles culled", int(np.count_nonzero(in_view & ~visible)))
+
+		# Adds the visible projectiles with the scaled frame of their animation
+		shifts = np.array([kind["shift"] for kind in PROJECTILE_TYPES])[kinds]
+		tops = SETTINGS.graphics.resolution[1] // 2 - heights // 2 + heights * shifts
+		lefts = screen_x - half_widths
+		for i in np.flatnonzero(visible).tolist():
+			self.game.raycasting.projectiles_to_render.append((
+				float(norm_dists[i]), self.get_frame(i, int(heights[i]), int(half_widths[i]) * 2),
+				(float(lefts[i]), float(tops[i]))
+			))
+		return screen_x, half_widths, norm_dists
+
+
+	def get_frame(self, i: int, height: int, width: int) -> pygame.Surface:
+		"""
+		Returns the current animation frame of a projectile scaled to the given size, from the sprite cache if possible.
+		:param i: The index of the projectile.
+		:param height: The height of the projectile on the screen.
+		:param width: The width of the projectile on the screen.
+		"""
+		kind = int(self.kind[i])
+		animation = self.animations[kind]
+		image = animation[int(self.age[i] // PROJECTILE_TYPES[kind]["animation_time"]) % len(animation)]
+
+		key = (image, height, -1)
+		frame = self.game.object_renderer.sprite_cache.get(key)
+		if frame is None:
+			frame = self.game.object_renderer.sprite_cache.add(
+				key, self.game.object_renderer.sprite_cache.scale(image, (width, height))
+			)
+		return frame
+
+
+	def render_2D_sprites(self):
+		"""
+		Renders every projectile in 2D mode in a single call.
+		"""
+		if time.time() - self.game.start_time <= self.game.map.TITLE_SCREEN_DURATION + self.game.map.TITLE_SCREEN_BLEND_TIME:
+			return None
+
+		# Only scales each frame once to its 2D size
+		images = []
+		for kind, animation in enumerate(self.animations):
+			size = int(SETTINGS.graphics.sprite_size_2D * PROJECTILE_TYPES[kind]["scale"])
+			size = (int(size * animation[0].get_width() / animation[0].get_height()), size)
+			if (animation[0], size) not in _2D_images:
+				_2D_images[(animation[0], size)] = pygame.transform.scale(animation[0], size)
+			images.append(_2D_images[(animation[0], size)])
+
+		alive = slice(0, self.count)
+		offsets = np.array([SETTINGS.graphics.sprite_size_2D * kind["scale"] // 2 for kind in PROJECTILE_TYPES])
+		lefts = ((self.x[alive] * self.game.map.tile_size).astype(np.int32) - offsets[self.kind[alive]]).tolist()
+		tops = ((self.y[alive] * self.game.map.tile_size).astype(np.int32) - offsets[self.kind[alive]]).tolist()
+		blits = [(images[kind], (left, top)) for kind, left, top in zip(self.kind[alive].tolist(), lefts, tops)]
+
+		self.game.screen.fblits(blits)
+		self.game.dirty_rects.extend(image.get_rect(topleft=position) for image, position in blits)
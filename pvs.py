@@ -0,0 +1,290 @@
+import numpy as np
+import hashlib
+
+from line_of_sight import trace
+
+
+class PotentiallyVisibleSet:
+	"""
+	Whether each tile can see each other tile, stored as a bitset per tile.
+	The walls of a map never move, so the set is computed once, then cached to disk and only computed again when the
+	grid of the map changes. Most of the lines of sight can then be rejected with a single bit test.
+	The set is conservative : a pair of tiles is only rejected if no line between any of their points is clear.
+	"""
+	# Changes the key of every cached set, to compute them again when the way they are computed changes
+	VERSION = 3
+
+	# The points of the edges of each tile from which the lines between the tiles are traced : its corners and the
+	# middles of its edges, so any point of the edges is at most a quarter of a tile away from one of them along each axis
+	SAMPLES = ((0, 0), (0.5, 0), (1, 0), (1, 0.5), (1, 1), (0.5, 1), (0, 1), (0, 0.5))
+
+	# How far the walls are eroded from the empty tiles before the lines between the samples are traced against them,
+	# a bit further than the samples are from any point of the edges
+	EROSION = 0.25 + 1e-6
+
+	# The amount of pairs of tiles traced at once, which bounds the memory taken by the computation
+	CHUNK_PAIRS = 1 << 18
+
+	def __init__(self, grid: np.ndarray, path: str):
+		"""
+		:param grid: The grid of the map, indexed as grid[x, y].
+		:param path: Where the set is cached.
+		"""
+		self.grid = grid
+		self.path = path
+		self.key = self.get_key(grid)
+
+		# The bitset of each tile, indexed by x * height + y, one bit per tile in the same order
+		self.bits = self.load()
+		if self.bits is None:
+			self.bits = self.compute()
+			self.save()
+
+
+	@classmethod
+	def get_key(cls, grid: np.ndarray) -> str:
+		"""
+		Returns the hash identifying the set of the given grid.
+		:param grid: The grid of the map.
+		"""
+		key = hashlib.sha1(f"{cls.VERSION} {grid.shape}".encode())
+		key.update(np.ascontiguousarray(grid, dtype=np.int32).tobytes())
+		return key.hexdigest()
+
+
+	def load(self):
+		"""
+		Returns the bitsets cached for this grid, or None if they were not cached yet or the grid changed since.
+		"""
+		try:
+			with np.load(self.path) as cached:
+				if str(cached["key"]) == self.key:
+					return cached["bits"]
+		except (OSError, ValueError, KeyError):
+			pass
+		return None
+
+
+	def save(self):
+		"""
+		Caches the bitsets to disk, if possible.
+		"""
+		try:
+			with open(self.path, "wb") as cache_file:
+				np.savez(cache_file, key=np.array(self.key), bits=self.bits)
+		except OSError:
+			# The set is only a cache, it is computed again the next time the map is loaded
+			pass
+
+
+	def compute(self) -> np.ndarray:
+		"""
+		Returns the bitset of each tile.
+		A pair of empty tiles is visible if a line between any of the samples of their edges facing each other misses the
+		eroded walls. Any clear line between two tiles can be cut down to go from the edges of one facing the other to
+		the edges of the other facing the first, and the line between the closest samples, on the same edges, never
+		strays from it by more than the erosion, so it misses the eroded walls and no visible pair is rejected. The lines
+		of sight end inside the walls, so a wall is visible from the tiles which can see one of its empty neighbours, and
+		the walls can see every tile, in case something stands in one.
+		The pairs are traced by chunks, and the set is only ever held as bits. Computing it takes about a second for a
+		map of 24x24 tiles and over ten seconds for one of 64x64 tiles, which is why it is cached.
+		"""
+		width, height = self.grid.shape
+		tiles = width * height
+		walls = self.grid.ravel() != 0
+		empty = np.flatnonzero(~walls)
+		empty_x, empty_y = np.divmod(empty, height)
+		eroded_walls = self.get_eroded_walls()
+
+		bits = np.zeros((tiles, -(-tiles // 8)), dtype=np.uint8)
+		bits[walls] = 0xFF
+		self.set_bits(bits, empty, empty)
+
+		# A clear line goes through a neighbour of its target closer to its source right before reaching it, so the pairs
+		# are traced by increasing distance between their tiles, and only once one of these neighbours is visible. Each
+		# pair is only traced in one direction, towards the tiles after its source, as the tiles see each other both ways
+		for distance in range(1, width + height - 1):
+			offset_x = np.arange(1, distance + 1)
+			offset_y = distance - offset_x
+			offset_x = np.concatenate(([0], offset_x, offset_x[offset_y > 0]))
+			offset_y = np.concatenate(([distance], offset_y, -offset_y[offset_y > 0]))
+
+			offsets = max(self.CHUNK_PAIRS // len(empty), 1)
+			for start in range(0, len(offset_x), offsets):
+				step_x = np.sign(offset_x[start:start + offsets, None])
+				step_y = np.sign(offset_y[start:start + offsets, None])
+				x = empty_x + offset_x[start:start + offsets, None]
+				y = empty_y + offset_y[start:start + offsets, None]
+				sources = np.broadcast_to(empty, x.shape)
+				pairs = (x < width) & (y >= 0) & (y < height)
+				pairs[pairs] = ~walls[x[pairs] * height + y[pairs]]
+
+				candidates = np.zeros(pairs.shape, dtype=bool)
+				for neighbour_x, neighbour_y in ((x - step_x, y), (x, y - step_y), (x - step_x, y - step_y)):
+					neighbours = neighbour_x[pairs] * height + neighbour_y[pairs]
+					candidates[pairs] |= ((bits[sources[pairs], neighbours >> 3] >> (7 - (neighbours & 7))) & 1) != 0
+
+				targets = x[candidates] * height + y[candidates]
+				sources = sources[candidates]
+				found = self.trace_samples(eroded_walls, sources, targets)
+				self.set_bits(bits, sources[found], targets[found])
+				self.set_bits(bits, targets[found], sources[found])
+
+		# Marks the walls next to the visible empty tiles, by chunks of tiles seeing them
+		wall_grid = walls.reshape(width, height)
+		rows = max(self.CHUNK_PAIRS // tiles, 1)
+		for start in range(0, len(empty), rows):
+			sources = empty[start:start + rows]
+			visible = np.unpackbits(bits[sources], axis=1, count=tiles).reshape(len(sources), width, height) != 0
+			seen = visible & ~wall_grid
+			spread = seen.copy()
+			spread[:, 1:] |= seen[:, :-1]
+			spread[:, :-1] |= seen[:, 1:]
+			seen = spread.copy()
+			seen[:, :, 1:] |= spread[:, :, :-1]
+			seen[:, :, :-1] |= spread[:, :, 1:]
+			visible |= seen & wall_grid
+			bits[sources] = np.packbits(visible.reshape(len(sources), tiles), axis=1)
+		return bits
+
+
+	def trace_samples(self, eroded_walls: np.ndarray, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+		"""
+		Returns whether a line between any of the samples of the edges of each pair of tiles facing each other misses the
+		eroded walls.
+		:param eroded_walls: The boxes of the eroded walls, as returned by get_eroded_walls.
+		:param sources: The tiles the lines start from.
+		:param targets: The tiles the lines end at, one per source.
+		"""
+		source_x, source_y = np.divmod(sources, self.grid.shape[1])
+		target_x, target_y = np.divmod(targets, self.grid.shape[1])
+		step_x, step_y = np.sign(target_x - source_x), np.sign(target_y - source_y)
+		found = np.zeros(sources.shape, dtype=bool)
+		for source_offset_x, source_offset_y in self.SAMPLES:
+			leaving = self.on_edges(source_offset_x, source_offset_y, step_x, step_y)
+			for target_offset_x, target_offset_y in self.SAMPLES:
+				# Only traces the lines of the pairs not known to be visible yet, between the edges facing each other
+				entering = self.on_edges(target_offset_x, target_offset_y, -step_x, -step_y)
+				pairs = np.flatnonzero(~found & leaving & entering)
+				if pairs.size:
+					found[pairs] = self.is_clear(
+						eroded_walls,
+						source_x[pairs] + source_offset_x, source_y[pairs] + source_offset_y,
+						target_x[pairs] + target_offset_x, target_y[pairs] + target_offset_y
+					)
+		return found
+
+
+	@staticmethod
+	def on_edges(offset_x: float, offset_y: float, step_x: np.ndarray, step_y: np.ndarray) -> np.ndarray:
+		"""
+		Returns whether a sample is on one of the edges of its tile facing each direction.
+		:param offset_x: The x coordinate of the sample in its tile.
+		:param offset_y: The y coordinate of the sample in its tile.
+		:param step_x: The sign of the x coordinate of each direction.
+		:param step_y: The sign of the y coordinate of each direction.
+		"""
+		return (step_x * (2 * offset_x - 1) > 0) | (step_y * (2 * offset_y - 1) > 0)
+
+
+	def get_eroded_walls(self) -> np.ndarray:
+		"""
+		Returns the walls eroded from the empty tiles, as two boxes per tile, which only cover walls.
+		The sides of each wall next to an empty tile are moved in by the erosion, and the corners of a wall only
+		touching an empty tile diagonally are cut out by leaving them out of one box through their rows, and out of the
+		other through their columns.
+		:return: An array of shape (2, 4, width, height), with the left, top, right and bottom of each box.
+		"""
+		width, height = self.grid.shape
+		# The outside of the map is empty, like the lines of sight consider it
+		padded = np.pad(self.grid != 0, 1, constant_values=False)
+
+		def empty(dx: int, dy: int) -> np.ndarray:
+			return ~padded[1 + dx:1 + dx + width, 1 + dy:1 + dy + height]
+
+		corners = {
+			(dx, dy): empty(dx, dy) & ~empty(dx, 0) & ~empty(0, dy)
+			for dx in (-1, 1) for dy in (-1, 1)
+		}
+		tile_x, tile_y = np.meshgrid(np.arange(width), np.arange(height), indexing="ij")
+		left, right = tile_x + self.EROSION * empty(-1, 0), tile_x + 1 - self.EROSION * empty(1, 0)
+		top, bottom = tile_y + self.EROSION * empty(0, -1), tile_y + 1 - self.EROSION * empty(0, 1)
+		return np.array([
+			(
+				left, top + self.EROSION * (corners[-1, -1] | corners[1, -1]),
+				right, bottom - self.EROSION * (corners[-1, 1] | corners[1, 1])
+			),
+			(
+				left + self.EROSION * (corners[-1, -1] | corners[-1, 1]), top,
+				right - self.EROSION * (corners[1, -1] | corners[1, 1]), bottom
+			)
+		])
+
+
+	def is_clear(self, eroded_walls: np.ndarray, origin_x, origin_y, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+		"""
+		Returns whether each line misses the eroded walls between its ends.
+		:param eroded_walls: The boxes of the eroded walls, as returned by get_eroded_walls.
+		:param origin_x: The x coordinates the lines start from.
+		:param origin_y: The y coordinates the lines start from.
+		:param x: The x coordinates the lines end at.
+		:param y: The y coordinates the lines end at.
+		"""
+		def blocks(lines: np.ndarray, tile_x: np.ndarray, tile_y: np.ndarray) -> np.ndarray:
+			boxes = eroded_walls[:, :, tile_x, tile_y].transpose(1, 0, 2)
+			return self.crosses(origin_x[lines], origin_y[lines], x[lines], y[lines], boxes).any(axis=0)
+		return trace(self.grid, origin_x, origin_y, x, y, blocks)
+
+
+	@staticmethod
+	def crosses(origin_x: np.ndarray, origin_y: np.ndarray, x: np.ndarray, y: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+		"""
+		Returns whether each line goes through the inside of each of its boxes, as touching their border is not enough.
+		:param origin_x: The x coordinates the lines start from.
+		:param origin_y: The y coordinates the lines start from.
+		:param x: The x coordinates the lines end at.
+		:param y: The y coordinates the lines end at.
+		:param boxes: The left, top, right and bottom of the boxes of each line, the lines along the last axis.
+		"""
+		left, top, right, bottom = boxes
+		entering, leaving = 0, 1
+		# The part of each line between both sides of its boxes along each axis, as a fraction of its length. The lines
+		# parallel to the sides are always between them when strictly between them, and never when on one of them
+		with np.errstate(divide="ignore", invalid="ignore"):
+			for origin, end, low, high in ((origin_x, x, left, right), (origin_y, y, top, bottom)):
+				near, far = (low - origin) / (end - origin), (high - origin) / (end - origin)
+				entering = np.maximum(entering, np.minimum(near, far))
+				leaving = np.minimum(leaving, np.maximum(near, far))
+		return entering < leaving
+
+
+	@staticmethod
+	def set_bits(bits: np.ndarray, tiles: np.ndarray, targets: np.ndarray):
+		"""
+		Marks each target as visible in the bitset of its tile.
+		:param bits: The bitsets of the tiles.
+		:param tiles: The tiles seeing the targets.
+		:param targets: The tiles seen, one per tile.
+		"""
+		np.bitwise_or.at(bits, (tiles, targets >> 3), (0x80 >> (targets & 7)).astype(np.uint8))
+
+
+	def can_see(self, tile: tuple, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+		"""
+		Returns whether a tile can potentially see each of the given positions. The positions outside of the map are
+		always potentially visible.
+		:param tile: The coordinates of the tile.
+		:param x: The x coordinates of the positions.
+		:param y: The y coordinates of the positions.
+		"""
+		width, height = self.grid.shape
+		visible = np.ones(x.shape, dtype=bool)
+		if not (0 <= tile[0] < width and 0 <= tile[1] < height):
+			return visible
+
+		tiles_x, tiles_y = np.floor(x).astype(np.int32), np.floor(y).astype(np.int32)
+		inside = (tiles_x >= 0) & (tiles_x < width) & (tiles_y >= 0) & (tiles_y < height)
+		targets = tiles_x[inside] * height + tiles_y[inside]
+		bits = self.bits[tile[0] * height + tile[1]]
+		visible[inside] = (bits[targets >> 3] >> (7 - (targets & 7))) & 1
+		return visible
@@ -0,0 +1,79 @@
+from settings import SETTINGS, set_column_width
+
+
+class QualityGovernor:
+	"""
+	Adjusts the rendering quality at runtime to keep the frame time under the target set in settings.json.
+	"""
+	# How much the average frame time can exceed the target before lowering the quality
+	LOWER_THRESHOLD = 1.1
+	# How much below the target the average frame time has to be before raising the quality
+	RAISE_THRESHOLD = 0.7
+	# How many frames to wait after a change before judging the new quality level
+	COOLDOWN_FRAMES = 45
+	# How much each frame weighs in the average frame time
+	SMOOTHING = 0.1
+
+	# The quality set by the player in settings.json
+	BASE_COLUMN_WIDTH = SETTINGS.graphics.scale
+	BASE_FOG = SETTINGS.graphics.advanced_depth_darkening
+
+	def __init__(self, game):
+		"""
+		:param game: The instance of the Game.
+		"""
+		self.game = game
+
+		# The quality levels, from the best to the worst, as (column width, whether the fog is enabled)
+		fog = self.BASE_FOG  # The fog is never enabled if turned off by the player
+		self.levels = [
+			(self.BASE_COLUMN_WIDTH, fog),
+			(self.BASE_COLUMN_WIDTH * 2, fog),
+			(self.BASE_COLUMN_WIDTH * 2, False),
+			(self.BASE_COLUMN_WIDTH * 4, False),
+		]
+
+		# Each new game starts at the best quality
+		self.level = 0
+		set_column_width(self.BASE_COLUMN_WIDTH)
+		SETTINGS.graphics.advanced_depth_darkening = fog
+
+		# The average frame time, and the frames left before the quality can change again
+		self.average_frame_time = SETTINGS.graphics.target_frame_time
+		self.cooldown = self.COOLDOWN_FRAMES
+
+
+	def update(self):
+		"""
+		Measures the last frame time, and changes the quality level if it stays too far away from the target.
+		"""
+		# Uses the time spent on the frame, without the time the clock waited to cap the framerate
+		self.average_frame_time += (self.game.clock.get_rawtime() - self.average_frame_time) * self.SMOOTHING
+		self.game.render_stats.count("quality level", self.level)
+
+		if self.cooldown > 0:
+			self.cooldown -= 1
+			return None
+
+		if self.average_frame_time > SETTINGS.graphics.target_frame_time * self.LOWER_THRESHOLD \
+				and self.level < len(self.levels) - 1:
+			self.set_level(self.level + 1)
+		elif self.average_frame_time < SETTINGS.graphics.target_frame_time * self.RAISE_THRESHOLD \
+				and self.level > 0:
+			self.set_level(self.level - 1)
+
+
+	def set_level(self, level: int):
+		"""
+		Applies the given quality level.
+		:param level: The index of the quality level.
+		"""
+		self.level = level
+		column_width, fog = self.levels[level]
+		if column_width != SETTINGS.graphics.scale:
+			self.game.object_renderer.set_column_width(column_width)
+		SETTINGS.graphics.advanced_depth_darkening = fog
+
+		# Waits for the new level to settle before judging it, starting from the target frame time
+		self.cooldown = self.COOLDOWN_FRAMES
+		self.average_frame_time = SETTINGS.graphics.target_frame_time
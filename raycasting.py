@@ -1,5 +1,9 @@
 import pygame
+import numpy as np
 import math
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Tuple
 
 from settings import SETTINGS
 
@@ -8,6 +12,9 @@ class RayCasting:
 	"""
 	Main engine of the game for the raycasts. Generates the pseudo3D and the 2D
 	"""
+	# Worker pool shared by every game instance, used to render the wall strips in parallel
+	strip_pool = None
+
 	def __init__(self, game):
 		"""
 		:param game: The instance of the Game.
@@ -17,95 +24,211 @@ class RayCasting:
 		# The results of raycasting
 		self.ray_casting_result = []
 
-		# The objects to render
+		# The pose of the camera the results were cast from, to reuse them in the next frames
+		self._last_pose = None
+
+		# The same results as an array of shape (num_rays, 4), and the depth of the wall hit by each ray
+		self.ray_arrays = np.zeros((0, 4))
+		self.depths = self.ray_arrays[:, 0]
+
+		# The light level in front of the wall hit by each ray, and the version of the light map it was read from
+		self.ray_lights = np.zeros(0, dtype=np.int32)
+		self._light_version = None
+
+		# The wall columns to render, the other objects (sprites) to render, and the projectiles to render
+		self.walls_to_render = []
 		self.objects_to_render = []
+		self.projectiles_to_render = []
 
-		# A pointer towards the wall textures
+		# A pointer towards the wall textures and their pre-sliced columns
 		self.wall_textures = self.game.object_renderer.wall_textures
+		self.wall_columns = self.game.object_renderer.wall_columns
+
+		# A pointer towards the cache of the wall columns darkened by the fog
+		self.column_cache = self.game.object_renderer.column_cache
+
+		# The wall columns of the last frame, by size, scaled into again instead of allocating new ones. The workers
+		# rendering the strips take them under the lock
+		self._spare_columns = {}
+		self._spare_columns_lock = Lock()
+
+		# A pointer towards the distance fog, darkening the walls and sprites
+		self.fog = self.game.object_renderer.fog
 
 		self._masking_surface = self.game.screen.copy()
 
+		# Creates the pool of workers rendering the vertical strips of the screen if enabled
+		if SETTINGS.graphics.render_threads > 0 and RayCasting.strip_pool is None:
+			RayCasting.strip_pool = ThreadPoolExecutor(
+				max_workers=SETTINGS.graphics.render_threads,
+				thread_name_prefix="strip_renderer"
+			)
+
 
 	def get_objects_to_render(self):
 		"""
 		Gets all objects to render.
 		"""
-		self.objects_to_render.clear()
+		# The wall columns of the last frame were already drawn, so they can be scaled into
+		for depth, wall_column, wall_pos in self.walls_to_render:
+			self._spare_columns.setdefault(wall_column.get_size(), []).append(wall_column)
+		self.walls_to_render.clear()
+
+		# Nothing was cast, as in 2D
+		if not self.ray_casting_result:
+			return None
+
+		with self.game.object_renderer.wall_columns_lock:
+			# Renders the screen as vertical strips, each handled by a worker of the pool
+			if RayCasting.strip_pool is not None:
+				strips = SETTINGS.graphics.render_threads
+				strip_width = -(-len(self.ray_casting_result) // strips)  # Rounded up
+				for strip in RayCasting.strip_pool.map(
+					self.render_strip,
+					range(0, len(self.ray_casting_result), strip_width),
+					range(strip_width, len(self.ray_casting_result) + strip_width, strip_width)
+				):
+					self.walls_to_render.extend(strip)
+
+			# Fetches all raycast results
+			else:
+				self.walls_to_render.extend(self.render_strip(0, len(self.ray_casting_result)))
+
+		# Frees the columns of the last frame no column of this one was scaled into
+		self._spare_columns.clear()
 
-		# Fetches all raycast results
-		# TODO : Can be parallelized
-		for ray, values in enumerate(self.ray_casting_result):
-			self.get_object_to_render(ray, values)
+	def render_strip(self, first_ray: int, last_ray: int) -> list:
+		"""
+		Renders the wall columns of a vertical strip of the screen.
+		:param first_ray: The first ray of the strip.
+		:param last_ray: The ray right after the last ray of the strip.
+		:return: The objects to render for this strip.
+		"""
+		return [
+			self.get_object_to_render(ray, self.ray_casting_result[ray])
+			for ray in range(first_ray, min(last_ray, len(self.ray_casting_result)))
+		]
 
-	def get_object_to_render(self, ray, values):
+	def get_object_to_render(self, ray, values) -> tuple:
 		"""
 		Renders a single object.
+		:return: The depth, image and position of the wall column.
 		"""
 		# Unpacks the result
 		depth, projection_height, texture, offset = values
-		# Gets the correct subportion of the wall to render
+		fog_band = self.fog.band(depth, int(self.ray_lights[ray]))
+		# Finds the correct column of the wall to render, and quantizes its height
+		column = int(offset * (SETTINGS.graphics.texture_size - SETTINGS.graphics.scale))
+		projection_height = int(projection_height) // SETTINGS.graphics.column_cache_height_step \
+			* SETTINGS.graphics.column_cache_height_step
+
 		if projection_height < SETTINGS.graphics.resolution[1]:  # Normal execution if we're not too close to the wall
-			wall_column = self.wall_textures[texture].subsurface(
-				offset * (SETTINGS.graphics.texture_size - SETTINGS.graphics.scale),
-				0,
-				SETTINGS.graphics.scale,
-				SETTINGS.graphics.texture_size
-			)
+			# Picks the column from the mip level matching the height of the column
+			level = self.game.object_renderer.mipmap_level(projection_height)
+			wall_column = self.get_source_column(texture, level, column >> level, fog_band)
 
 			# Calculates the correct column of the wall to render at the right size
-			wall_column = pygame.transform.scale(wall_column, (SETTINGS.graphics.scale, projection_height))
-			wall_pos = (ray * SETTINGS.graphics.scale, SETTINGS.graphics.half_height - projection_height // 2)
+			wall_column = self.scale_column(wall_column, (SETTINGS.graphics.scale, projection_height))
 
 		else:  # If the size of the wall exceeds the window's height
 			texture_height = SETTINGS.graphics.texture_size * SETTINGS.graphics.resolution[1] / projection_height
-			wall_column = self.wall_textures[texture].subsurface(
-				offset * (SETTINGS.graphics.texture_size - SETTINGS.graphics.scale),
+			wall_column = self.get_source_column(texture, 0, column, fog_band).subsurface(
+				0,
 				SETTINGS.graphics.half_texture_size - texture_height // 2,
 				SETTINGS.graphics.scale,
 				texture_height
 			)
+			self.column_cache.count_allocation()
 
 			# Calculates the correct column of the wall to render at the right size
-			wall_column = pygame.transform.scale(wall_column,
-			                                     (SETTINGS.graphics.scale, SETTINGS.graphics.resolution[1]))
+			wall_column = self.scale_column(wall_column, (SETTINGS.graphics.scale, SETTINGS.graphics.resolution[1]))
+
+		# Finds the position of the column on the screen
+		if projection_height < SETTINGS.graphics.resolution[1]:
+			wall_pos = (ray * SETTINGS.graphics.scale, SETTINGS.graphics.half_height - projection_height // 2)
+		else:
 			wall_pos = (ray * SETTINGS.graphics.scale, 0)
-		# Darkens the wall column based on its distance with the camera
-		wall_column = self.darken(wall_column, depth)
-		# Adds the object to the list of objects to render
-		self.objects_to_render.append((depth, wall_column.convert(), wall_pos))
 
-	def darken(self, surf: pygame.Surface, depth: float, multiplier: float = 2) -> pygame.Surface:
+		# Returns the object to render
+		return depth, wall_column, wall_pos
+
+	def get_source_column(self, texture: int, level: int, column: int, fog_band: int) -> pygame.Surface:
+		"""
+		Returns a column of a wall texture darkened by the fog, before it is scaled to the height of the wall.
+		Darkening subtracts the same color from every pixel, so it gives the same pixels before or after scaling. The
+		darkened columns are cached instead of the scaled ones, as they come back while the camera moves, when the
+		heights of the walls change every frame. They are never drawn on the screen, so evicting them is cheap.
+		:param texture: The index of the wall texture.
+		:param level: The mip level of the texture.
+		:param column: The horizontal position of the column in the mip level.
+		:param fog_band: The fog band darkening the column.
+		"""
+		level_columns = self.wall_columns[texture][level]
+		source = level_columns[min(column, len(level_columns) - 1)]
+		if not fog_band:
+			return source
+
+		key = (texture, level, column, fog_band)
+		darkened = self.column_cache.get(key)
+		if darkened is None:
+			# Copies the column into an evicted one if possible (the textures are already opaque)
+			darkened = self.column_cache.take(source.get_size())
+			if darkened is None:
+				darkened = source.copy()
+			else:
+				darkened.blit(source, (0, 0))
+			darkened = self.column_cache.add(key, self.fog.apply(darkened, fog_band))
+		return darkened
+
+	def scale_column(self, wall_column: pygame.Surface, size: Tuple[int, int]) -> pygame.Surface:
+		"""
+		Scales a wall column into a column of the last frame of the same size if possible, instead of allocating a new
+		one.
+		:param wall_column: The column to scale.
+		:param size: The size to scale it to.
+		:return: The scaled column.
+		"""
+		with self._spare_columns_lock:
+			spare_columns = self._spare_columns.get(size)
+			destination = spare_columns.pop() if spare_columns else None
+		if destination is None:
+			self.column_cache.count_allocation()
+			return pygame.transform.scale(wall_column, size)
+		return pygame.transform.scale(wall_column, size, destination)
+
+	def count_visible_rays(self, left: float, right: float, depth: float) -> Tuple[int, int]:
+		"""
+		Counts the rays between the given screen coordinates whose wall is further away than the given depth.
+		:param left: The left edge of the span on the screen.
+		:param right: The right edge of the span on the screen.
+		:param depth: The depth of the object spanning these columns.
+		:return: The amount of rays in which the object is in front of the wall, and the amount of rays in the span.
+		"""
+		first_ray = max(int(left // SETTINGS.graphics.scale), 0)
+		last_ray = min(math.ceil(right / SETTINGS.graphics.scale), len(self.depths))
+		if first_ray >= last_ray:
+			return 0, 0
+		return int(np.count_nonzero(self.depths[first_ray:last_ray] > depth)), last_ray - first_ray
+
+	def darken(self, surf: pygame.Surface, depth: float, light: int = 0) -> pygame.Surface:
 		"""
 		Returns a darkened version of the given surface based on the depth.
 		:param surf: The surface to darken.
 		:param depth: The depth at which the surface will be placed in 3D space.
-		:param multiplier: The darkening multiplier, default is 2.
+		:param light: The light level of the surface's tile, default is 0.
 		:return: The darkened surface.
 		"""
-		# Uses a darkening method, heavy on the CPU
-		if SETTINGS.graphics.advanced_depth_darkening:
-			# Creates a surface with a special tag with the size of the given surface
-			darkener = pygame.Surface(surf.get_size(), flags=pygame.SRCALPHA)
-
-			# Remembers how much this is to darken
-			darkening_depth = depth * multiplier  # Adjust based on liking, found 2 to be subtle but effective
-
-			# Darkens the darkening surface
-			darkener.fill((darkening_depth, darkening_depth, darkening_depth, 0))
-
-			# Blits the darkener on top of the base surface, essentially making it darker
-			surf.blit(darkener, (0, 0), special_flags=pygame.BLEND_RGBA_SUB)
-
-		# Returns the surface
-		return surf
+		return self.fog.apply(surf, self.fog.band(depth, light))
 
 
-	def ray_cast(self):
+	def ray_cast(self, first_ray: int, last_ray: int) -> list:
 		"""
 		Casts a ray in every direction from the player's FOV to render the map.
+		:param first_ray: The first ray to cast.
+		:param last_ray: The ray right after the last ray to cast.
+		:return: The depth, projection height, texture and offset of each cast ray.
 		"""
-		# Clears the last raycasting result
-		self.ray_casting_result.clear()
+		results = []
 
 		# Original position of the player on the map at the start of the frame
 		original_position_x, original_position_y = self.game.player.pos
@@ -119,8 +242,8 @@ class RayCasting:
 		# avoid divisions by zero
 		base_ray_angle = self.game.player.angle - SETTINGS.graphics.fov / 2 + 0.0001
 
-		# Raycasts n times where n is the amount of rays we want to cast
-		for ray in range(SETTINGS.graphics.num_rays):
+		# Raycasts every requested ray
+		for ray in range(first_ray, last_ray):
 			# Calculates the angle of the ray
 			ray_angle = base_ray_angle + (ray * SETTINGS.graphics.delta_angle)
 
@@ -139,7 +262,8 @@ class RayCasting:
 			direction_x = delta_depth * cos_a
 
 			# Looping for each vertical up to the maximum depth
-			for i in range(SETTINGS.graphics.max_depth):
+			i = 0
+			while i < SETTINGS.graphics.max_depth:
 				tile_hor = int(horizontal_x), int(horizontal_y)
 
 				# If we found a wall, we stop the cycle
@@ -147,10 +271,15 @@ class RayCasting:
 					texture_horizontal = self.game.map.world_map[tile_hor]
 					break
 
-				# Otherwise, we keep going
-				horizontal_x += direction_x
-				horizontal_y += direction_y
-				depth_horizontal += delta_depth
+				# Otherwise, we keep going, jumping over the empty space around the tile
+				steps = min(
+					self.game.map.empty_space_steps(tile_hor, direction_x, direction_y),
+					SETTINGS.graphics.max_depth - i
+				)
+				horizontal_x += direction_x * steps
+				horizontal_y += direction_y * steps
+				depth_horizontal += delta_depth * steps
+				i += steps
 
 			# Determines the intersections with the vertical tiles
 			vertical_x, direction_x = (map_position_x + 1, 1) if cos_a > 0 else (map_position_x - 1e-6, -1)
@@ -164,7 +293,8 @@ class RayCasting:
 			direction_y = delta_depth * sin_a
 
 			# Looping for each vertical up to the maximum depth
-			for i in range(SETTINGS.graphics.max_depth):
+			i = 0
+			while i < SETTINGS.graphics.max_depth:
 				tile_vert = int(vertical_x), int(vertical_y)
 
 				# If we found a wall, we stop the cycle
@@ -172,10 +302,15 @@ class RayCasting:
 					texture_vertical = self.game.map.world_map[tile_vert]
 					break
 
-				# Otherwise, we keep going
-				vertical_x += direction_x
-				vertical_y += direction_y
-				depth_vertical += delta_depth
+				# Otherwise, we keep going, jumping over the empty space around the tile
+				steps = min(
+					self.game.map.empty_space_steps(tile_vert, direction_x, direction_y),
+					SETTINGS.graphics.max_depth - i
+				)
+				vertical_x += direction_x * steps
+				vertical_y += direction_y * steps
+				depth_vertical += delta_depth * steps
+				i += steps
 
 			# We keep as final depth the smallest depth between the vertical and horizontal lines, as well as
 			# the texture coordinates
@@ -195,10 +330,7 @@ class RayCasting:
 			projection_height = SETTINGS.graphics.screen_distance / (depth + 0.0001)  # Tiny margin not to divide by zero
 
 			# Walls drawing
-			if self.game.is_3D:
-				self.ray_casting_result.append(
-					(depth, projection_height, texture, offset)
-				)
+			results.append((depth, projection_height, texture, offset))
 
 			# Draws the raycast for debug purposes
 			# if self.game.is_3D is False:
@@ -216,10 +348,220 @@ class RayCasting:
 			# 		2
 			# 	)
 
+		return results
+
+
+	def ray_cast_numpy(self, first_ray: int, last_ray: int) -> list:
+		"""
+		Casts the rays of the player's FOV at once using NumPy arrays against the map's dense tile grid.
+		Produces the same results as ray_cast, without looping over the rays in Python.
+		:param first_ray: The first ray to cast.
+		:param last_ray: The ray right after the last ray to cast.
+		:return: The depth, projection height, texture and offset of each cast ray.
+		"""
+
+		# Original position of the player on the map at the start of the frame
+		original_position_x, original_position_y = self.game.player.pos
+		# Coordinates of the tile the player is on
+		map_position_x, map_position_y = self.game.player.map_pos
+
+		# Calculates the angle of every ray at once
+		ray_angles = (
+			self.game.player.angle - SETTINGS.graphics.fov / 2 + 0.0001
+			+ np.arange(first_ray, last_ray) * SETTINGS.graphics.delta_angle
+		)
+		sin_a, cos_a = np.sin(ray_angles), np.cos(ray_angles)
+
+		# The steps taken along the horizontal and vertical lines, shared by every ray
+		steps = np.arange(SETTINGS.graphics.max_depth)
+
+		with np.errstate(divide="ignore", invalid="ignore"):
+			# Determines the intersections of horizontal tiles
+			horizontal_y = np.where(sin_a > 0, map_position_y + 1, map_position_y - 1e-6)
+			direction_y = np.where(sin_a > 0, 1, -1)
+			depth_horizontal = (horizontal_y - original_position_y) / sin_a
+			horizontal_x = original_position_x + depth_horizontal * cos_a
+			delta_depth_horizontal = direction_y / sin_a
+			direction_x = delta_depth_horizontal * cos_a
+
+			# Finds the first wall on the horizontal lines of each ray
+			texture_horizontal, steps_horizontal = self._first_wall_hit(
+				horizontal_x[:, None] + steps * direction_x[:, None],
+				horizontal_y[:, None] + steps * direction_y[:, None]
+			)
+			depth_horizontal = depth_horizontal + steps_horizontal * delta_depth_horizontal
+			horizontal_x = (horizontal_x + steps_horizontal * direction_x) % 1
+
+			# Determines the intersections with the vertical tiles
+			vertical_x = np.where(cos_a > 0, map_position_x + 1, map_position_x - 1e-6)
+			direction_x = np.where(cos_a > 0, 1, -1)
+			depth_vertical = (vertical_x - original_position_x) / cos_a
+			vertical_y = original_position_y + depth_vertical * sin_a
+			delta_depth_vertical = direction_x / cos_a
+			direction_y = delta_depth_vertical * sin_a
+
+			# Finds the first wall on the vertical lines of each ray
+			texture_vertical, steps_vertical = self._first_wall_hit(
+				vertical_x[:, None] + steps * direction_x[:, None],
+				vertical_y[:, None] + steps * direction_y[:, None]
+			)
+			depth_vertical = depth_vertical + steps_vertical * delta_depth_vertical
+			vertical_y = (vertical_y + steps_vertical * direction_y) % 1
+
+		# We keep as final depth the smallest depth between the vertical and horizontal lines, as well as
+		# the texture coordinates
+		vertical_is_closer = depth_vertical < depth_horizontal
+		depth = np.where(vertical_is_closer, depth_vertical, depth_horizontal)
+		texture = np.where(vertical_is_closer, texture_vertical, texture_horizontal)
+		offset = np.where(
+			vertical_is_closer,
+			np.where(cos_a > 0, vertical_y, 1 - vertical_y),
+			np.where(sin_a > 0, 1 - horizontal_x, horizontal_x)
+		)
+
+		# Removing fishbowl effect
+		depth *= np.cos(self.game.player.angle - ray_angles)
+
+		# Projection mapping
+		projection_height = SETTINGS.graphics.screen_distance / (depth + 0.0001)
+
+		return list(zip(depth.tolist(), projection_height.tolist(), texture.tolist(), offset.tolist()))
+
+
+	def _first_wall_hit(self, tiles_x: np.ndarray, tiles_y: np.ndarray):
+		"""
+		Finds the first wall along each row of the given tile coordinates.
+		:param tiles_x: The x coordinates of each step of each ray, of shape (num_rays, max_depth).
+		:param tiles_y: The y coordinates of each step of each ray, of shape (num_rays, max_depth).
+		:return: The texture of the wall hit by each ray (1 if none), and the amount of steps taken before hitting it
+		(max_depth if none).
+		"""
+		grid = self.game.map.grid
+
+		# Truncates the coordinates the same way int() does, and only looks up the tiles within the map
+		tiles_x = np.nan_to_num(tiles_x, nan=-1, posinf=-1, neginf=-1).astype(np.int64)
+		tiles_y = np.nan_to_num(tiles_y, nan=-1, posinf=-1, neginf=-1).astype(np.int64)
+		inside = (tiles_x >= 0) & (tiles_x < grid.shape[0]) & (tiles_y >= 0) & (tiles_y < grid.shape[1])
+		values = np.zeros(tiles_x.shape, dtype=grid.dtype)
+		values[inside] = grid[tiles_x[inside], tiles_y[inside]]
+
+		# Finds the first step at which a wall was found
+		hits = values > 0
+		has_hit = hits.any(axis=1)
+		first_hit = hits.argmax(axis=1)
+		texture = np.where(has_hit, values[np.arange(values.shape[0]), first_hit], 1)
+		return texture, np.where(has_hit, first_hit, SETTINGS.graphics.max_depth)
+
 
 	def update(self):
 		"""
 		Gets called every frame, runs the engine logic.
 		"""
-		self.ray_cast()
-		self.get_objects_to_render()
+		self.objects_to_render.clear()
+		self.projectiles_to_render.clear()
+
+		# The walls of the last frame are still valid if the camera has not moved, and only need to be shaded again if
+		# the light in front of them changed
+		pose = self.get_pose()
+		if pose == self._last_pose:
+			self.game.render_stats.count("rays reused", len(self.ray_casting_result))
+			if self._light_version != self.game.light_map.version:
+				self._light_version = self.game.light_map.version
+				ray_lights = self.get_ray_lights()
+				if not np.array_equal(ray_lights, self.ray_lights):
+					self.ray_lights = ray_lights
+					self.game.render_backend.build_walls()
+			return None
+
+		cast = self.game.render_backend.cast_rays
+		num_rays = SETTINGS.graphics.num_rays if self.game.is_3D else 0
+		shift = self.get_ray_shift(pose)
+		self._last_pose = pose
+
+		# If the camera turned by a whole amount of rays, the rays still in view are moved and only the new ones are cast
+		if shift > 0:
+			self.ray_casting_result[:] = (
+				self.move_rays(self.ray_casting_result[shift:], shift, 0) + cast(num_rays - shift, num_rays)
+			)
+		elif shift < 0:
+			self.ray_casting_result[:] = cast(0, -shift) + self.move_rays(self.ray_casting_result[:shift], 0, -shift)
+		else:
+			self.ray_casting_result[:] = cast(0, num_rays)
+		rays_cast = abs(shift) or num_rays
+		self.game.render_stats.count("rays cast", rays_cast)
+		self.game.render_stats.count("rays reused", num_rays - rays_cast)
+
+		self.ray_arrays = np.array(self.ray_casting_result, dtype=float).reshape(-1, 4)
+		self.depths = self.ray_arrays[:, 0]
+		self._light_version = self.game.light_map.version
+		self.ray_lights = self.get_ray_lights()
+		self.game.render_backend.build_walls()
+
+
+	def get_ray_lights(self) -> np.ndarray:
+		"""
+		Returns the light level of the tile in front of the wall hit by each ray, which is the tile lighting that wall.
+		"""
+		rays = np.arange(len(self.depths))
+		ray_angles = self.game.player.angle - self.get_ray_angles(rays)
+		# Steps back a little from the wall along the ray, the depths having lost the fishbowl effect
+		distances = self.depths / np.cos(self.get_ray_angles(rays)) - 0.01
+		return self.game.light_map.lights_of(
+			self.game.player.x + distances * np.cos(ray_angles),
+			self.game.player.y + distances * np.sin(ray_angles)
+		)
+
+
+	def move_rays(self, results: list, from_ray: int, to_ray: int) -> list:
+		"""
+		Moves the results of consecutive rays to other columns of the screen.
+		The removal of the fishbowl effect depends on the column, so their depth and projection height are corrected.
+		:param results: The results of the rays to move.
+		:param from_ray: The column of the first ray before moving.
+		:param to_ray: The column of the first ray after moving.
+		:return: The moved results.
+		"""
+		depth, _, texture, offset = np.array(results, dtype=float).reshape(-1, 4).T
+		rays = np.arange(len(results))
+		depth = depth * np.cos(self.get_ray_angles(to_ray + rays)) / np.cos(self.get_ray_angles(from_ray + rays))
+		projection_height = SETTINGS.graphics.screen_distance / (depth + 0.0001)
+		return list(zip(depth.tolist(), projection_height.tolist(), texture.astype(int).tolist(), offset.tolist()))
+
+
+	@staticmethod
+	def get_ray_angles(rays: np.ndarray) -> np.ndarray:
+		"""
+		Returns the angle between the center of the screen and each of the given rays.
+		:param rays: The indices of the rays.
+		"""
+		return SETTINGS.graphics.fov / 2 - 0.0001 - rays * SETTINGS.graphics.delta_angle
+
+
+	def get_pose(self) -> tuple:
+		"""
+		Returns everything the walls rendered this frame depend on : the player's position and angle, and the rendering
+		settings.
+		"""
+		return (
+			self.game.player.x, self.game.player.y, self.game.player.angle, self.game.is_3D,
+			SETTINGS.graphics.num_rays, self.game.render_backend.name,
+			SETTINGS.graphics.advanced_depth_darkening, SETTINGS.graphics.dynamic_lighting
+		)
+
+
+	def get_ray_shift(self, pose: tuple) -> int:
+		"""
+		Finds by how many rays the camera turned since the last frame.
+		:param pose: The pose of the camera this frame.
+		:return: The amount of rays the results should be shifted by (positive when turning right), or 0 if the camera
+		did anything else than turning by a whole amount of rays.
+		"""
+		if self._last_pose is None or pose[:2] != self._last_pose[:2] or pose[3:] != self._last_pose[3:]:
+			return 0
+
+		# Angle difference, wrapped in [-pi, pi[ to account for the player's angle being wrapped around tau
+		difference = (pose[2] - self._last_pose[2] + math.pi) % math.tau - math.pi
+		shift = round(difference / SETTINGS.graphics.delta_angle)
+		if abs(shift) >= SETTINGS.graphics.num_rays or abs(difference - shift * SETTINGS.graphics.delta_angle) > 1e-9:
+			return 0
+		return shift
@@ -0,0 +1,123 @@
+"""
+Contains the backends rendering the 3D view, selected with the render_backend setting.
+Every backend renders the same image as the reference backend, using faster implementations of some of its stages.
+"""
+from settings import SETTINGS
+
+
+class RenderBackend:
+	"""
+	The reference backend : marches the rays in Python, scales a surface for every wall column, and draws the walls and
+	sprites sorted together from the furthest to the closest.
+	The other backends override the stages they implement differently.
+	"""
+	name = "reference"
+
+	def __init__(self, game):
+		"""
+		:param game: The instance of the Game.
+		"""
+		self.game = game
+
+
+	def cast_rays(self, first_ray: int, last_ray: int) -> list:
+		"""
+		Casts the given rays of the player's FOV.
+		:param first_ray: The first ray to cast.
+		:param last_ray: The ray right after the last ray to cast.
+		:return: The depth, projection height, texture and offset of each cast ray.
+		"""
+		return self.game.raycasting.ray_cast(first_ray, last_ray)
+
+
+	def build_walls(self):
+		"""
+		Prepares the walls to draw from the results of the rays, once they were cast.
+		"""
+		self.game.raycasting.get_objects_to_render()
+
+
+	def draw_walls(self):
+		"""
+		Draws the walls which are not composited along with the sprites, right after the background.
+		"""
+		pass
+
+
+	def composite(self):
+		"""
+		Draws the walls and sprites left to draw onto the rendering surface.
+		"""
+		self.game.object_renderer.render_game_objects()
+
+
+class ZBufferBackend(RenderBackend):
+	"""
+	Draws all the wall columns at once, then clips the sprites against the depth of each ray instead of sorting them
+	along with the walls.
+	"""
+	name = "zbuffer"
+
+	def composite(self):
+		self.game.object_renderer.render_game_objects_zbuffer()
+
+
+class NumpyBackend(ZBufferBackend):
+	"""
+	Casts every ray at once with NumPy, and composites like the zbuffer backend.
+	"""
+	name = "numpy"
+
+	def cast_rays(self, first_ray: int, last_ray: int) -> list:
+		return self.game.raycasting.ray_cast_numpy(first_ray, last_ray)
+
+
+class SurfarrayBackend(NumpyBackend):
+	"""
+	Casts the rays like the numpy backend, and writes the wall textures straight into the pixels of the rendering
+	surface instead of scaling a surface per column.
+	"""
+	name = "surfarray"
+
+	def build_walls(self):
+		# The walls are drawn from the results of the rays directly
+		self.game.raycasting.walls_to_render.clear()
+		self.game.object_renderer.build_walls_surfarray()
+
+	def draw_walls(self):
+		self.game.object_renderer.render_walls_surfarray()
+
+
+class SpanBackend(NumpyBackend):
+	"""
+	Casts the rays like the numpy backend, and merges the consecutive columns showing the same face of a wall into
+	spans, each scaled from the texture at once instead of one surface per column.
+	"""
+	name = "spans"
+
+	def build_walls(self):
+		# The walls are drawn from the results of the rays directly
+		self.game.raycasting.walls_to_render.clear()
+
+	def draw_walls(self):
+		self.game.object_renderer.render_walls_spans()
+
+
+# Every backend, by name
+BACKENDS = {
+	backend.name: backend
+	for backend in (RenderBackend, ZBufferBackend, NumpyBackend, SurfarrayBackend, SpanBackend)
+}
+
+
+def get_backend(game, name: str = None) -> RenderBackend:
+	"""
+	Creates the backend with the given name.
+	:param game: The instance of the Game.
+	:param name: The name of the backend, default is defined in settings.json
+	"""
+	if name is None:
+		name = SETTINGS.graphics.render_backend
+	if name not in BACKENDS:
+		raise ValueError(f"Unknown render backend '{name}', expected one of {', '.join(BACKENDS)}")
+	return BACKENDS[name](game)
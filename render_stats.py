@@ -0,0 +1,77 @@
+import time
+from contextlib import contextmanager
+from threading import Lock
+
+from surface_cache import SurfaceCache
+
+
+class RenderStats:
+	"""
+	Collects the rendering statistics of each frame, displayed in the debug overlay.
+	"""
+	def __init__(self):
+		# The counters of the frame being rendered
+		self.counters = {}
+
+		# The counters of the last complete frame
+		self.last_frame = {}
+
+		# The caches whose counters are reported every frame
+		self.caches = {}
+
+		# The counters can be incremented by the workers rendering the strips of the screen
+		self._lock = Lock()
+
+
+	def add_cache(self, name: str, cache: SurfaceCache):
+		"""
+		Reports the hits, misses, evictions, allocations and recycles of the given cache every frame.
+		:param name: The name under which the cache is reported.
+		:param cache: The cache to report.
+		"""
+		self.caches[name] = cache
+
+
+	def count(self, name: str, amount: int = 1):
+		"""
+		Increments a counter of the current frame.
+		:param name: The name of the counter.
+		:param amount: How much to add to the counter, default is 1.
+		"""
+		with self._lock:
+			self.counters[name] = self.counters.get(name, 0) + amount
+
+
+	@contextmanager
+	def timer(self, name: str):
+		"""
+		Measures the time spent in a stage of the rendering, added to the "<name> ms" counter of the current frame.
+		:param name: The name of the stage.
+		"""
+		start = time.perf_counter()
+		yield
+		self.count(f"{name} ms", (time.perf_counter() - start) * 1000)
+
+
+	def new_frame(self):
+		"""
+		Closes the current frame and starts counting a new one.
+		"""
+		with self._lock:
+			for name, cache in self.caches.items():
+				self.counters[f"{name} hits"] = cache.hits
+				self.counters[f"{name} misses"] = cache.misses
+				self.counters[f"{name} evictions"] = cache.evictions
+				self.counters[f"{name} allocations"] = cache.allocations
+				self.counters[f"{name} recycles"] = cache.recycles
+				cache.reset_counters()
+
+			self.last_frame = self.counters
+			self.counters = {}
+
+
+	def __str__(self):
+		return "  ".join(
+			f"{name}: {value:.2f}" if isinstance(value, float) else f"{name}: {value}"
+			for name, value in self.last_frame.items()
+		)
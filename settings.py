@@ -31,3 +31,14 @@ with open("settings.json", "r", encoding="utf-8") as settings_file:
     SETTINGS.graphics.scale = SETTINGS.graphics.resolution[0] // SETTINGS.graphics.num_rays
     SETTINGS.graphics.half_texture_size = SETTINGS.graphics.texture_size // 2
     SETTINGS.controls.mouse_border_right = SETTINGS.graphics.resolution[0] - SETTINGS.controls.mouse_border_left
+
+
+def set_column_width(width: int):
+    """
+    Changes the width of the column rendered by each ray at runtime, and the amount of rays accordingly.
+    :param width: The width of each column, in pixels.
+    """
+    SETTINGS.graphics.scale = width
+    SETTINGS.graphics.num_rays = SETTINGS.graphics.resolution[0] // width
+    SETTINGS.graphics.half_num_rays = SETTINGS.graphics.num_rays / 2
+    SETTINGS.graphics.delta_angle = SETTINGS.graphics.fov / SETTINGS.graphics.num_rays
@@ -0,0 +1,88 @@
+import math
+from typing import Tuple
+
+
+class SpatialHash:
+	"""
+	Buckets objects by the map tile they stand in, so the objects around a position can be found without looking at all
+	of them.
+	The objects only need x and y attributes, and are moved to another bucket when they change tile.
+	"""
+	def __init__(self):
+		# The objects in each tile, and the tile of each object
+		self.buckets = {}
+		self.tiles = {}
+
+
+	def __len__(self) -> int:
+		return len(self.tiles)
+
+
+	def insert(self, obj):
+		"""
+		Adds an object in the bucket of its tile, or moves it there if it was already added.
+		:param obj: The object to add.
+		"""
+		self.move(obj)
+
+
+	def move(self, obj):
+		"""
+		Moves an object to the bucket of the tile it is now in. Does nothing if it has not changed tile.
+		:param obj: The object to move.
+		"""
+		tile = (math.floor(obj.x), math.floor(obj.y))
+		previous_tile = self.tiles.get(obj)
+		if tile == previous_tile:
+			return None
+
+		if previous_tile is not None:
+			self._discard(obj, previous_tile)
+		self.tiles[obj] = tile
+		self.buckets.setdefault(tile, set()).add(obj)
+
+
+	def remove(self, obj):
+		"""
+		Removes an object from its bucket, if it was added.
+		:param obj: The object to remove.
+		"""
+		tile = self.tiles.pop(obj, None)
+		if tile is not None:
+			self._discard(obj, tile)
+
+
+	def _discard(self, obj, tile: Tuple[int, int]):
+		"""
+		Removes an object from the bucket of the given tile, and the bucket itself once it is empty.
+		:param obj: The object to remove.
+		:param tile: The tile of the bucket.
+		"""
+		bucket = self.buckets[tile]
+		bucket.discard(obj)
+		if not bucket:
+			del self.buckets[tile]
+
+
+	def query_tile(self, tile: Tuple[int, int]) -> list:
+		"""
+		Returns the objects standing in the given tile.
+		:param tile: The coordinates of the tile.
+		"""
+		return list(self.buckets.get(tile, ()))
+
+
+	def query_radius(self, x: float, y: float, radius: float) -> list:
+		"""
+		Returns the objects within the given distance of a position.
+		:param x: The x coordinate of the position.
+		:param y: The y coordinate of the position.
+		:param radius: The maximum distance of the objects to the position.
+		"""
+		objects = []
+		for tile_x in range(math.floor(x - radius), math.floor(x + radius) + 1):
+			for tile_y in range(math.floor(y - radius), math.floor(y + radius) + 1):
+				for obj in self.buckets.get((tile_x, tile_y), ()):
+					if (obj.x - x) ** 2 + (obj.y - y) ** 2 <= radius ** 2:
+						objects.append(obj)
+		return objects
@@ -8,6 +8,25 @@ import time
 from settings import SETTINGS
 
 
+# Every image loaded by the sprites, shared between all the sprites using the same file
+_loaded_images = {}
+
+def load_image(path: str) -> pygame.Surface:
+	"""
+	Loads the image at the given path, or returns it directly if it was already loaded.
+	The returned image is shared, and should never be modified.
+	:param path: The path to the image.
+	"""
+	path = os.path.normpath(path)
+	if path not in _loaded_images:
+		_loaded_images[path] = pygame.image.load(path).convert_alpha()
+	return _loaded_images[path]
+
+
+# Every image scaled to its size in the 2D view, keyed by the image and its size
+_2D_images = {}
+
+
 class SpriteObject:
 	def __init__(
 		self,
@@ -28,7 +47,7 @@ class SpriteObject:
 		self.game = game
 		self.player = game.player  # Creating a shorthand
 		self.x, self.y = pos
-		self.image = pygame.image.load(path).convert_alpha()
+		self.image = load_image(path)
 		self.IMAGE_WIDTH = self.image.get_width()
 		self.IMAGE_HALF_WIDTH = self.image.get_width() // 2
 		self.IMAGE_RATIO = self.IMAGE_WIDTH / self.image.get_height()
@@ -37,6 +56,7 @@ class SpriteObject:
 		self.culling_distance = 0.35  # How far away from the camera to cull the sprite
 		self.hidden = hidden  # Whether the sprite should be hidden in 2D view
 		self.darken = darken  # Whether to darken ythe sprite over distance
+		self.light = None  # The intensity and radius of the light emitted by the sprite, if it emits any
 		# Initialization of later attributes
 		self.theta, self.screen_x, self.dist, self.norm_dist = 0, 0, 1, 1
 		self.sprite_half_width = 0
@@ -69,6 +89,17 @@ class SpriteObject:
 		# Only makes further calculations if the sprite is in the visible spectrum
 		if -self.IMAGE_HALF_WIDTH < self.screen_x < (SETTINGS.graphics.resolution[0] + self.IMAGE_HALF_WIDTH) and\
 				self.norm_dist > self.culling_distance:
+			# Skips the sprite before scaling it if walls hide its whole span on the screen
+			self.sprite_half_width = SETTINGS.graphics.screen_distance / self.norm_dist * self.SPRITE_SCALE \
+				* self.IMAGE_RATIO // 2
+			visible_rays, spanned_rays = self.game.raycasting.count_visible_rays(
+				self.screen_x - self.sprite_half_width, self.screen_x + self.sprite_half_width, self.norm_dist
+			)
+			if spanned_rays and not visible_rays:
+				self.game.render_stats.count("sprites culled")
+				return None
+			self.game.render_stats.count("sprites partial" if visible_rays < spanned_rays else "sprites drawn")
+
 			self.get_sprite_projection()
 
 
@@ -77,11 +108,23 @@ class SpriteObject:
 		Gets the projected image of the sprite.
 		"""
 		proj = SETTINGS.graphics.screen_distance / self.norm_dist * self.SPRITE_SCALE
+		# Quantizes the size so the sprite can be found in the cache while its size barely changes
+		proj = max(int(proj) // SETTINGS.graphics.sprite_cache_height_step * SETTINGS.graphics.sprite_cache_height_step, 1)
 		# Takes into account different image ratios
 		proj_width, proj_height = proj * self.IMAGE_RATIO, proj
 
-		# Scales the sprite to the calculated size
-		image = pygame.transform.scale(self.image, (proj_width, proj_height))
+		# Uses the cached version of the frame if it was already scaled to this size and darkened this much
+		light = self.game.light_map.light_at(self.x, self.y)
+		fog_band = self.game.object_renderer.fog.band(self.norm_dist, light) if self.darken else -1
+		key = (self.image, proj_height, fog_band)
+		image = self.game.object_renderer.sprite_cache.get(key)
+		if image is None:
+			# Scales the sprite to the calculated size, into an evicted frame if possible
+			size = (int(proj_width), proj_height)
+			image = self.game.object_renderer.sprite_cache.scale(self.image, size)
+			if self.darken:
+				self.game.raycasting.darken(image, self.norm_dist, light)
+			image = self.game.object_renderer.sprite_cache.add(key, image)
 
 		# Finds the sprite's position on the screen
 		self.sprite_half_width = proj_width // 2
@@ -89,13 +132,7 @@ class SpriteObject:
 		pos = self.screen_x - self.sprite_half_width, SETTINGS.graphics.resolution[1] // 2 - proj_height // 2 + height_shift
 
 		# Adds the sprite to the array of objects to render during raycasting
-		self.game.raycasting.objects_to_render.append((
-			self.norm_dist,
-			image.convert_alpha() if self.darken is False else self.game.raycasting.darken(
-				image, self.norm_dist
-			),
-			pos
-		))
+		self.game.raycasting.objects_to_render.append((self.norm_dist, image, pos))
 
 
 	def render_2D_sprite(self):
@@ -103,21 +140,30 @@ class SpriteObject:
 		Renders a sprite in 2D mode.
 		"""
 		if time.time() - self.game.start_time > self.game.map.TITLE_SCREEN_DURATION + self.game.map.TITLE_SCREEN_BLEND_TIME:
-			self.game.screen.blit(
-				pygame.transform.scale(self.image, (
-					SETTINGS.graphics.sprite_size_2D * self.IMAGE_RATIO * self.SPRITE_SCALE,
-					SETTINGS.graphics.sprite_size_2D * self.SPRITE_SCALE
-				)),
+			# Only scales each image once to its 2D size
+			size = (
+				int(SETTINGS.graphics.sprite_size_2D * self.IMAGE_RATIO * self.SPRITE_SCALE),
+				int(SETTINGS.graphics.sprite_size_2D * self.SPRITE_SCALE)
+			)
+			if (self.image, size) not in _2D_images:
+				_2D_images[(self.image, size)] = pygame.transform.scale(self.image, size)
+
+			self.game.dirty_rects.append(self.game.screen.blit(
+				_2D_images[(self.image, size)],
 				(
 					int(self.x * self.game.map.tile_size) - SETTINGS.graphics.sprite_size_2D * self.SPRITE_SCALE // 2,
 					int(self.y * self.game.map.tile_size) - SETTINGS.graphics.sprite_size_2D * self.SPRITE_SCALE // 2
 				)
-			)
+			))
 
 	def update(self):
 		"""
 		Updates the sprite every frame.
 		"""
+		# Moves the light of the sprite along with it
+		if self.light is not None:
+			self.game.light_map.set_light(self, (int(self.x), int(self.y)), *self.light)
+
 		if self.game.is_3D:
 			self.get_sprite()
 		elif self.hidden is False:
@@ -177,7 +223,7 @@ class AnimatedSprite(SpriteObject):
 		for filename in os.listdir(path):
 			if os.path.isfile(os.path.join(path, filename)):
 				# Loads the file into the queue
-				images.append(pygame.image.load(os.path.join(path, filename)).convert_alpha())
+				images.append(load_image(os.path.join(path, filename)))
 
 		# Returns the queue of images
 		return images
@@ -257,7 +303,7 @@ class VFX(SpriteObject):
 		for filename in os.listdir(path):
 			if os.path.isfile(os.path.join(path, filename)):
 				# Loads the file into the queue
-				images.append(pygame.image.load(os.path.join(path, filename)).convert_alpha())
+				images.append(load_image(os.path.join(path, filename)))
 
 		# Returns the queue of images
 		return images
@@ -297,7 +343,7 @@ class VFX(SpriteObject):
 					self.image = images[self.current_frame]
 					self.current_frame += 1
 				else:
-					self.game.objects_handler.sprites_list.remove(self)
+					self.game.objects_handler.remove_sprite(self)
 
 
 	def update(self):
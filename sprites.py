@@ -19,11 +19,13 @@ from weapon import Shotgun
 class Candlebra(SpriteObject):
 	def __init__(self, game, pos):
 		super().__init__(game, path="assets/sprites/candlebra.png", pos=pos)
+		self.light = (6, 3)
 
 
 class GreenFlame(AnimatedSprite):
 	def __init__(self, game, pos):
 		super().__init__(game, path="assets/animated_sprites/green_flame/0.png", pos=pos)
+		self.light = (8, 4)
 
 
 class ShotgunPickup(Pickup):
@@ -0,0 +1,152 @@
+import pygame
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional, Tuple
+
+
+class SurfaceCache:
+	"""
+	A least recently used cache of surfaces, bounded by the memory taken by their pixels.
+	"""
+	def __init__(self, budget: int):
+		"""
+		:param budget: The maximum amount of bytes the cached surfaces can take.
+		"""
+		self.budget = budget
+		self.size = 0
+		self.surfaces = OrderedDict()
+
+		# The evicted surfaces, reused as destinations for new surfaces of the same size instead of allocating them.
+		# Surfaces evicted during a frame may still be drawn in it, so they are only recycled once it was drawn.
+		self.recycled = OrderedDict()
+		self.recycled_size = 0
+		self._evicted = []
+
+		# Counters of the cache's efficiency, and of the surfaces allocated or recycled to fill it
+		self.hits, self.misses, self.evictions = 0, 0, 0
+		self.allocations, self.recycles = 0, 0
+
+		# The cache can be used by the workers rendering the strips of the screen
+		self._lock = Lock()
+
+
+	def get(self, key):
+		"""
+		Returns the surface cached with the given key, or None if it is not in the cache.
+		:param key: The key of the surface.
+		"""
+		with self._lock:
+			surface = self.surfaces.get(key)
+			if surface is None:
+				self.misses += 1
+			else:
+				self.hits += 1
+				self.surfaces.move_to_end(key)
+			return surface
+
+
+	def add(self, key, surface: pygame.Surface) -> pygame.Surface:
+		"""
+		Adds a surface to the cache, evicting the least recently used surfaces if the budget is exceeded.
+		:param key: The key of the surface.
+		:param surface: The surface to cache. It should never be modified afterwards.
+		:return: The given surface.
+		"""
+		surface_size = surface.get_width() * surface.get_height() * surface.get_bytesize()
+		# Surfaces bigger than the whole budget are never cached
+		if surface_size > self.budget:
+			return surface
+
+		with self._lock:
+			if key in self.surfaces:
+				return surface
+			self.surfaces[key] = surface
+			self.size += surface_size
+
+			# Evicts the least recently used surfaces until the cache fits in its budget
+			while self.size > self.budget:
+				_, evicted = self.surfaces.popitem(last=False)
+				self.size -= evicted.get_width() * evicted.get_height() * evicted.get_bytesize()
+				self.evictions += 1
+				self._evicted.append(evicted)
+		return surface
+
+
+	def take(self, size: Tuple[int, int]) -> Optional[pygame.Surface]:
+		"""
+		Takes an evicted surface of the given size, to be drawn onto and added back instead of allocating a new one.
+		:param size: The size of the surface.
+		:return: The surface, or None if none was evicted with this size, in which case a new one has to be allocated.
+		"""
+		with self._lock:
+			surfaces = self.recycled.get(size)
+			if not surfaces:
+				self.allocations += 1
+				return None
+			self.recycles += 1
+			surface = surfaces.pop()
+			self.recycled_size -= surface.get_width() * surface.get_height() * surface.get_bytesize()
+			return surface
+
+
+	def scale(self, surface: pygame.Surface, size: Tuple[int, int]) -> pygame.Surface:
+		"""
+		Scales the given surface into an evicted surface of the same size if possible, instead of allocating a new one.
+		The cached surfaces should all share the same pixel format.
+		:param surface: The surface to scale.
+		:param size: The size to scale it to.
+		:return: The scaled surface.
+		"""
+		destination = self.take(size)
+		if destination is None:
+			return pygame.transform.scale(surface, size)
+		return pygame.transform.scale(surface, size, destination)
+
+
+	def count_allocation(self, amount: int = 1):
+		"""
+		Counts surfaces allocated without going through take(), to fill the cache or drawn along its surfaces, so every
+		surface allocated while rendering a frame is reported.
+		:param amount: How many surfaces were allocated, default is 1.
+		"""
+		with self._lock:
+			self.allocations += amount
+
+
+	def recycle(self):
+		"""
+		Makes the surfaces evicted since the last call available to take(), once they can no longer be drawn.
+		The recycled surfaces take at most half the budget, the sizes recycled the longest ago being freed first.
+		"""
+		with self._lock:
+			for surface in self._evicted:
+				self.recycled.setdefault(surface.get_size(), []).append(surface)
+				self.recycled.move_to_end(surface.get_size())
+				self.recycled_size += surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+			while self.recycled_size > self.budget // 2:
+				_, surfaces = self.recycled.popitem(last=False)
+				self.recycled_size -= sum(
+					surface.get_width() * surface.get_height() * surface.get_bytesize() for surface in surfaces
+				)
+			self._evicted.clear()
+
+
+	def clear(self):
+		"""
+		Empties the cache.
+		"""
+		with self._lock:
+			self.surfaces.clear()
+			self.size = 0
+			self.recycled.clear()
+			self.recycled_size = 0
+			self._evicted.clear()
+
+
+	def reset_counters(self):
+		"""
+		Resets the hit, miss, eviction, allocation and recycling counters.
+		"""
+		self.hits, self.misses, self.evictions = 0, 0, 0
+		self.allocations, self.recycles = 0, 0
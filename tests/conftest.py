@@ -0,0 +1,35 @@
+"""
+Runs the game without a window nor sound, from the root of the repository where its assets and settings are.
+"""
+import os
+import random
+import sys
+
+import numpy as np
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+
+@pytest.fixture(scope="session")
+def game():
+	"""
+	A game on the current level of the save, created once for every test.
+	"""
+	from main import Game
+	random.seed(0)
+	return Game()
+
+
+@pytest.fixture
+def pool(game):
+	"""
+	The projectile pool of the game, emptied before the test.
+	"""
+	pool = game.objects_handler.projectiles
+	pool.remove(np.ones(pool.count, dtype=bool))
+	return pool
@@ -0,0 +1,68 @@
+import math
+import time
+import numpy as np
+import pytest
+
+from emitters import Emitter
+
+
+@pytest.fixture
+def firing(game):
+	"""
+	Ends the title screen, during which the emitters hold fire.
+	"""
+	game.start_time = time.time() - game.map.TITLE_SCREEN_DURATION - 1
+	return game
+
+
+def test_ring_fires_every_volley_due(firing, pool):
+	emitter = Emitter(firing, "ring", pos=(5.5, 4.5), count=6, rate=10, speed=2)
+
+	# 2.5 volleys are due, the half volley is kept for the next update
+	firing.delta_time = 250
+	emitter.update()
+	assert pool.count == 12
+	firing.delta_time = 50
+	emitter.update()
+	assert pool.count == 18
+
+	# Every projectile leaves the emitter at 2 tiles per second, evenly spaced around it
+	assert np.allclose(pool.x[:pool.count], 5.5) and np.allclose(pool.y[:pool.count], 4.5)
+	assert np.allclose(np.hypot(pool.dx[:6], pool.dy[:6]), 2 / 1000)
+	angles = np.sort(np.arctan2(pool.dy[:6], pool.dx[:6]) % math.tau)
+	assert np.allclose(np.diff(angles), math.tau / 6)
+
+
+def test_emitter_stops_after_its_duration(firing, pool):
+	emitter = Emitter(firing, "fan", pos=(5.5, 4.5), count=3, rate=4, duration=1)
+	firing.objects_handler.add_emitter(emitter)
+	# Half a volley is charged per update, and the eighth update reaches the end of its duration
+	firing.delta_time = 125
+	for _ in range(10):
+		firing.objects_handler.update()
+
+	assert emitter.finished
+	assert emitter not in firing.objects_handler.emitters
+	assert emitter.volleys == 3
+
+
+def test_map_declares_emitters(firing, pool):
+	firing.map.map_data["emitters"] = [
+		{"pattern": "spiral", "pos": [5.5, 4.5], "count": 3, "rate": [[0, 2], [10, 8]], "speed": 2.5, "spin": 12}
+	]
+	try:
+		firing.map.load_emitters()
+	finally:
+		del firing.map.map_data["emitters"]
+	emitter = firing.objects_handler.emitters[-1]
+	firing.objects_handler.emitters.remove(emitter)
+
+	firing.delta_time = 1000
+	emitter.update()
+	assert emitter.volleys == 2
+	assert pool.count == 6
+
+
+def test_unknown_pattern_is_rejected(game):
+	with pytest.raises(ValueError):
+		Emitter(game, "nope", pos=(1, 1))
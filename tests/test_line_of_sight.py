@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from line_of_sight import trace
+
+
+@pytest.fixture
+def grid():
+	"""
+	A 7 by 5 room, with walls all around and a pillar in its middle, indexed as grid[x, y].
+	"""
+	grid = np.zeros((7, 5), dtype=np.int32)
+	grid[[0, -1], :] = 1
+	grid[:, [0, -1]] = 1
+	grid[3, 2] = 1
+	return grid
+
+
+def test_lines_through_the_pillar_are_stopped(grid):
+	x = np.array([5.5, 3.5, 2.5, 5.5, 3.5])
+	y = np.array([2.5, 1.5, 3.5, 3.5, 2.5])
+	# Across the pillar, to the tile above it, to the tile below the start, slanting through it, and into it
+	assert trace(grid, 1.5, 2.5, x, y).tolist() == [False, True, True, False, True]
+
+
+def test_only_the_walls_between_the_ends_stop_the_lines(grid):
+	# The tiles at both ends are not checked, and the outside of the map is empty, but the walls of the map still count
+	assert trace(grid, 1.2, 1.2, np.array([1.8]), np.array([1.9])).all()
+	assert trace(grid, -2.5, 2.5, np.array([9.5]), np.array([2.5])).tolist() == [False]
+	assert trace(grid, -2.5, -1.5, np.array([9.5]), np.array([-1.5])).all()
+
+
+def test_batched_lines_match_single_lines(grid):
+	generator = np.random.default_rng(0)
+	origin_x, origin_y = generator.uniform(-1, 8, 500), generator.uniform(-1, 6, 500)
+	x, y = generator.uniform(-1, 8, 500), generator.uniform(-1, 6, 500)
+	single = [bool(trace(grid, origin_x[i], origin_y[i], x[i:i + 1], y[i:i + 1])[0]) for i in range(500)]
+	assert trace(grid, origin_x, origin_y, x, y).tolist() == single
+
+	# Some lines start and end in the same tile, some are blocked, and some are not
+	assert 0 < sum(single) < 500
+
+
+def test_query_matches_the_lines_traced_from_the_player(game):
+	free = np.argwhere(game.map.grid == 0)
+	generator = np.random.default_rng(1)
+	points = free[generator.integers(len(free), size=300)] + generator.random((300, 2))
+	x, y = points[:, 0], points[:, 1]
+
+	# The potentially visible set only rejects lines which would be stopped anyway
+	player_x, player_y = game.player.pos
+	expected = trace(game.map.grid, player_x, player_y, x, y)
+	assert np.array_equal(game.objects_handler.line_of_sight.query(x, y), expected)
@@ -0,0 +1,24 @@
+from pickups import Pickup
+
+
+class RecordedPickup(Pickup):
+	"""
+	A pickup remembering whether it was picked up.
+	"""
+	def pick_up(self):
+		self.picked_up = True
+
+
+def test_pickups_are_picked_up_from_their_own_distance(game):
+	handler = game.objects_handler
+	player_x, player_y = round(game.player.x, 1), round(game.player.y, 1)
+	near = RecordedPickup(game, pos=(player_x + 0.2, player_y))
+	far = RecordedPickup(game, pos=(player_x + 1.2, player_y + 1.2), pickup_distance=1.5)
+	out_of_reach = RecordedPickup(game, pos=(player_x + 1.2, player_y), pickup_distance=1)
+	for pickup in (near, far, out_of_reach):
+		handler.add_sprite(pickup)
+
+	handler.update()
+	assert near.picked_up and far.picked_up and not out_of_reach.picked_up
+	assert near not in handler.sprites_list and far not in handler.sprites_list
+	handler.remove_sprite(out_of_reach)
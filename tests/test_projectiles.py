@@ -0,0 +1,48 @@
+import numpy as np
+
+from settings import SETTINGS
+
+
+def test_spawn_grows_the_pool(pool):
+	capacity = len(pool.x)
+	pool.spawn(np.arange(capacity + 1) + 0.5, 4.5, 0.001, 0)
+	assert pool.count == capacity + 1 and len(pool.x) >= capacity + 1
+	assert np.array_equal(pool.x[:pool.count], np.arange(capacity + 1) + 0.5)
+	assert np.all(pool.y[:pool.count] == 4.5) and np.all(pool.dx[:pool.count] == 0.001)
+
+	# Every projectile gets its own identifier, and the ones going through walls are blue fireballs
+	pool.spawn(1.5, 1.5, 0, 0, noclip=True)
+	assert len(np.unique(pool.ids[:pool.count])) == pool.count
+	assert pool.noclip[pool.count - 1] and pool.kind[pool.count - 1] == 1
+	assert not pool.noclip[:pool.count - 1].any() and not pool.kind[:pool.count - 1].any()
+
+
+def test_remove_keeps_the_remaining_projectiles_in_order(pool):
+	pool.spawn(np.arange(6) + 0.5, np.arange(6) + 1.5, 0, 0)
+	ids = pool.ids[:pool.count].copy()
+
+	destroyed = np.array([True, False, False, True, False, True])
+	pool.remove(destroyed)
+	assert pool.count == 3
+	assert np.array_equal(pool.x[:pool.count], [1.5, 2.5, 4.5])
+	assert np.array_equal(pool.y[:pool.count], [2.5, 3.5, 5.5])
+	assert np.array_equal(pool.ids[:pool.count], ids[~destroyed])
+
+	pool.remove(np.ones(pool.count, dtype=bool))
+	assert pool.count == 0
+
+
+def test_projectile_is_visible_in_any_of_its_columns(game, pool, monkeypatch):
+	scale = SETTINGS.graphics.scale
+	monkeypatch.setattr(game.raycasting, "depths", np.array([5, 1, 1, 1, 1, 5], dtype=float))
+
+	# Centered on a close wall, but its edges reach the far walls on both sides
+	screen_x = np.array([3 * scale, 3 * scale, 3 * scale, 0.5 * scale, 5.5 * scale])
+	half_widths = np.array([0.5 * scale, 2.5 * scale, 2.5 * scale, 0, 10 * scale])
+	norm_dists = np.array([2, 2, 6, 2, 2], dtype=float)
+	assert pool.is_visible(screen_x, half_widths, norm_dists).tolist() == [False, True, False, True, True]
+
+
+def test_projectiles_are_hidden_without_rays(game, pool, monkeypatch):
+	monkeypatch.setattr(game.raycasting, "depths", np.zeros(0))
+	assert not pool.is_visible(np.array([10.0]), np.array([5.0]), np.array([1.0])).any()
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from line_of_sight import trace
+from pvs import PotentiallyVisibleSet
+
+
+@pytest.fixture
+def grid():
+	"""
+	A small maze of random walls, indexed as grid[x, y].
+	"""
+	return (np.random.default_rng(2).random((12, 10)) < 0.35).astype(np.int32)
+
+
+def test_visible_pairs_are_never_rejected(grid, tmp_path):
+	pvs = PotentiallyVisibleSet(grid, str(tmp_path / "map.pvs.npz"))
+	generator = np.random.default_rng(3)
+	free = np.argwhere(grid == 0)
+	rejected = 0
+	for _ in range(50):
+		origin = free[generator.integers(len(free))] + generator.random(2)
+		# Random points, and points on the borders and corners of the tiles
+		offsets = generator.choice([1e-9, 0.5, 1 - 1e-9, generator.random()], (grid.size, 2))
+		points = np.argwhere(np.ones(grid.shape)) + offsets
+		visible = pvs.can_see((int(origin[0]), int(origin[1])), points[:, 0], points[:, 1])
+		assert not (trace(grid, origin[0], origin[1], points[:, 0], points[:, 1]) & ~visible).any()
+		rejected += np.count_nonzero(~visible)
+
+	# The set is still worth it
+	assert rejected > 0
+
+
+def test_walls_see_everything(grid, tmp_path):
+	pvs = PotentiallyVisibleSet(grid, str(tmp_path / "map.pvs.npz"))
+	x, y = np.argwhere(np.ones(grid.shape)).T + 0.5
+	for wall in np.argwhere(grid != 0):
+		assert pvs.can_see(tuple(wall), x, y).all()
+
+
+def test_set_is_cached_until_the_grid_changes(grid, tmp_path, monkeypatch):
+	path = str(tmp_path / "map.pvs.npz")
+	computed = []
+	compute = PotentiallyVisibleSet.compute
+	monkeypatch.setattr(PotentiallyVisibleSet, "compute", lambda pvs: computed.append(pvs) or compute(pvs))
+
+	bits = PotentiallyVisibleSet(grid, path).bits
+	assert np.array_equal(PotentiallyVisibleSet(grid, path).bits, bits)
+	assert len(computed) == 1
+
+	changed = grid.copy()
+	changed[0, 0] = 1 - changed[0, 0]
+	PotentiallyVisibleSet(changed, path)
+	assert len(computed) == 2
+
+
+def test_set_works_without_a_cache(grid, tmp_path):
+	# The cache cannot be written in a directory which does not exist
+	pvs = PotentiallyVisibleSet(grid, str(tmp_path / "missing" / "map.pvs.npz"))
+	assert pvs.bits.shape == (grid.size, -(-grid.size // 8))
+
+
+def test_only_the_samples_of_the_edges_facing_the_target_are_traced():
+	steps = np.array([1, 0, 1]), np.array([0, 1, 1])
+	facing = [PotentiallyVisibleSet.on_edges(x, y, *steps) for x, y in PotentiallyVisibleSet.SAMPLES]
+	# Three samples on the right edge, three on the bottom edge, and five on either of them
+	assert np.count_nonzero(facing, axis=0).tolist() == [3, 3, 5]
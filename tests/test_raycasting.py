@@ -0,0 +1,18 @@
+from settings import SETTINGS
+
+
+def test_walls_are_scaled_into_the_columns_of_the_last_frame(game, monkeypatch):
+	monkeypatch.setattr(game, "is_3D", True)
+	raycasting = game.raycasting
+	raycasting._last_pose = None
+	raycasting.update()
+	columns = {id(image) for depth, image, pos in raycasting.walls_to_render}
+	assert len(columns) == SETTINGS.graphics.num_rays
+
+	# Building the same walls again only allocates the subsurfaces of the walls taller than the screen
+	game.object_renderer.column_cache.reset_counters()
+	raycasting.get_objects_to_render()
+	assert {id(image) for depth, image, pos in raycasting.walls_to_render} == columns
+	assert game.object_renderer.column_cache.allocations == sum(
+		image.get_height() == SETTINGS.graphics.resolution[1] for depth, image, pos in raycasting.walls_to_render
+	)
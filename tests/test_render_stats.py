@@ -0,0 +1,30 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from render_stats import RenderStats
+from surface_cache import SurfaceCache
+
+
+def test_counts_from_many_threads_are_all_kept():
+	stats = RenderStats()
+
+	def count_strip(_):
+		for _ in range(10000):
+			stats.count("columns")
+
+	with ThreadPoolExecutor(max_workers=4) as pool:
+		list(pool.map(count_strip, range(8)))
+	stats.new_frame()
+	assert stats.last_frame["columns"] == 80000
+
+
+def test_new_frame_reports_and_resets_the_caches():
+	stats = RenderStats()
+	cache = SurfaceCache(budget=1000)
+	stats.add_cache("columns", cache)
+	cache.get("missing")
+	stats.count("rays cast", 3)
+
+	stats.new_frame()
+	assert stats.last_frame["rays cast"] == 3 and stats.last_frame["columns misses"] == 1
+	stats.new_frame()
+	assert stats.last_frame["columns misses"] == 0 and "rays cast" not in stats.last_frame
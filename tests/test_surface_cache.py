@@ -0,0 +1,80 @@
+import pygame
+
+from surface_cache import SurfaceCache
+
+
+def make_surface(width: int) -> pygame.Surface:
+	"""
+	Returns a 32 bits surface 25 pixels high, so it takes 100 bytes of the cache per column.
+	"""
+	return pygame.Surface((width, 25), depth=32)
+
+
+def test_cache_stays_within_its_budget():
+	cache = SurfaceCache(budget=1000)
+	for key in range(4):
+		cache.add(key, make_surface(3))
+	assert cache.size == 900 and cache.evictions == 1
+	assert list(cache.surfaces) == [1, 2, 3]
+
+	# A surface bigger than the whole budget is returned without being cached
+	big = make_surface(11)
+	assert cache.add("big", big) is big
+	assert "big" not in cache.surfaces and cache.size == 900
+
+
+def test_least_recently_used_surface_is_evicted():
+	cache = SurfaceCache(budget=1000)
+	first, second = make_surface(3), make_surface(3)
+	cache.add("first", first)
+	cache.add("second", second)
+	assert cache.get("first") is first
+
+	# "second" was used the longest ago, so it makes room for the new surfaces
+	cache.add("third", make_surface(3))
+	cache.add("fourth", make_surface(1))
+	cache.add("fifth", make_surface(1))
+	assert cache.get("second") is None
+	assert cache.get("first") is first
+	assert (cache.hits, cache.misses, cache.evictions) == (2, 1, 1)
+
+
+def test_evicted_surfaces_are_recycled_after_the_frame():
+	cache = SurfaceCache(budget=1000)
+	evicted = make_surface(5)
+	cache.add("evicted", evicted)
+	cache.add("new", make_surface(6))
+
+	# The evicted surface may still be drawn during this frame
+	assert cache.take((5, 25)) is None
+	cache.recycle()
+	assert cache.take((5, 25)) is evicted
+	assert cache.take((5, 25)) is None
+	assert (cache.allocations, cache.recycles) == (2, 1)
+
+
+def test_recycled_surfaces_take_half_the_budget_at_most():
+	cache = SurfaceCache(budget=1000)
+	for key, width in enumerate((4, 3, 6, 2)):
+		cache.add(key, make_surface(width))
+	cache.recycle()
+
+	# The 4 and 3 wide surfaces were evicted, and do not fit together in half the budget, so the first one is freed
+	assert cache.recycled_size == 300
+	assert cache.take((4, 25)) is None
+	assert cache.take((3, 25)) is not None
+
+
+def test_scale_draws_into_a_recycled_surface():
+	cache = SurfaceCache(budget=1000)
+	evicted = make_surface(5)
+	cache.add("evicted", evicted)
+	cache.add("new", make_surface(6))
+	cache.recycle()
+
+	source = pygame.Surface((1, 5), depth=32)
+	source.fill((255, 0, 0))
+	scaled = cache.scale(source, (5, 25))
+	assert scaled is evicted
+	assert scaled.get_at((2, 12))[:3] == (255, 0, 0)
+	assert cache.scale(source, (5, 25)) is not evicted
@@ -64,6 +64,8 @@ class Weapon(AnimatedSprite):
 		self.reload_sound_name = reload_sound_name
 		if self.reload_sound_name is not None:
 			self.game.sound.load_sound(self.reload_sound_name, reload_sound_path)
+		# The intensity and radius of the muzzle flash lighting the player's surroundings, if it has one
+		self.light = (10, 3)
 
 
 	def get_damage(self, distance: float) -> float:
@@ -118,6 +120,12 @@ class Weapon(AnimatedSprite):
 		self.check_animation_time()
 		self.animate_shot()
 
+		# Lights up the player's surroundings during the first frames of the shot
+		if self.light is not None and self.reloading and self.frame_counter < 2:
+			self.game.light_map.set_light(self, self.game.player.map_pos, *self.light)
+		else:
+			self.game.light_map.remove_light(self)
+
 	@property
 	def ammo(self):
 		return self._ammo
@@ -175,6 +183,7 @@ class Fist(Weapon):
 			speed_multiplier=1.1,
 			reload_sound_name=None
 		)
+		self.light = None
 
 	def get_damage(self, distance: float) -> float:
 		return 100 if distance < 0.75 else 0